@@ -11,24 +11,123 @@ from __future__ import annotations
 
 import asyncio
 import datetime
+import functools
+import heapq
+import itertools
 import json
 import logging
-import mimetypes
 import os
 import re
+import threading
+import time
 import uuid
-from typing import Any, Dict, Optional
-
-import httpx
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 
 from ..config import config
-from .replacer import generate_styled_image
+
+if TYPE_CHECKING:
+    import httpx
+
+# httpx / mimetypes / replacer are imported lazily inside the functions that use them so
+# importing this module (list_jobs / get_job callers) stays cheap.
 
 logger = logging.getLogger(__name__)
 
 STYLE_JOBS: Dict[str, Dict[str, Any]] = {}
-_JOB_SAVE_LOCK = asyncio.Lock()
+# job_id -> created_at as epoch seconds (list sort key); kept out of the job dict so it is
+# neither persisted nor returned by the status/list endpoints
+_JOB_CREATED_EPOCH: Dict[str, float] = {}
+# One write state (lock + seq bookkeeping) per job dir so independent jobs persist in
+# parallel. Writers take it on the loop when they are submitted, so an entry lives exactly
+# as long as some write for that dir is pending. _LOCKS_GUARD only protects lookup/creation.
+_JOB_LOCKS: "weakref.WeakValueDictionary[str, _JobWriteState]" = weakref.WeakValueDictionary()
+_LOCKS_GUARD = threading.Lock()
+_PERSIST_SEQ = itertools.count()
 _JOB_FILENAME = "job.json"
+# Persisted layout per job dir:
+# - job.json: header only (status/counters/config) — rewritten often, stays tiny
+# - items.json.zst (items.json without zstandard): full items snapshot
+# - items.jsonl: append-only per-item updates since the last snapshot, replayed on load
+_ITEMS_FILENAME = "items.json.zst"
+_ITEMS_PLAIN_FILENAME = "items.json"
+_ITEMS_LOG_FILENAME = "items.jsonl"
+_ITEMS_ZSTD_LEVEL = 3
+
+# Connection-level retries (DNS blips / connect resets) handled inside the transport.
+_HTTP_RETRIES = 2
+
+
+@functools.lru_cache(maxsize=1)
+def _http2_available() -> bool:
+    try:
+        import h2  # type: ignore  # noqa: F401
+    except Exception:
+        return False
+    return True
+
+
+def _retrying_transport(*, verify: bool = True) -> httpx.AsyncHTTPTransport:
+    """Pooled transport with built-in connect retries; HTTP/2 when the `h2` extra is installed."""
+    import httpx
+
+    return httpx.AsyncHTTPTransport(
+        retries=_HTTP_RETRIES,
+        http2=_http2_available(),
+        verify=verify,
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+    )
+
+
+# Process-wide clients reused across items/jobs (keep-alive, no per-call TLS handshakes).
+# The LLM client verifies TLS; the image downloader keeps the legacy verify=False behaviour.
+_SHARED_CLIENT: Optional[httpx.AsyncClient] = None
+_DOWNLOAD_CLIENT: Optional[httpx.AsyncClient] = None
+
+
+def _get_shared_client() -> httpx.AsyncClient:
+    global _SHARED_CLIENT
+    if _SHARED_CLIENT is None or _SHARED_CLIENT.is_closed:
+        import httpx
+
+        _SHARED_CLIENT = httpx.AsyncClient(transport=_retrying_transport(), timeout=60.0)
+    return _SHARED_CLIENT
+
+
+def _get_download_client() -> httpx.AsyncClient:
+    global _DOWNLOAD_CLIENT
+    if _DOWNLOAD_CLIENT is None or _DOWNLOAD_CLIENT.is_closed:
+        import httpx
+
+        _DOWNLOAD_CLIENT = httpx.AsyncClient(
+            transport=_retrying_transport(verify=False), follow_redirects=True, timeout=30.0
+        )
+    return _DOWNLOAD_CLIENT
+
+
+async def close_shared_clients() -> None:
+    """Close the pooled HTTP clients (FastAPI shutdown hook)."""
+    global _SHARED_CLIENT, _DOWNLOAD_CLIENT
+    for client in (_SHARED_CLIENT, _DOWNLOAD_CLIENT):
+        if client is not None and not client.is_closed:
+            await client.aclose()
+    _SHARED_CLIENT = None
+    _DOWNLOAD_CLIENT = None
+
+
+_SAFE_NAME_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_-")
+_SAFE_NAME_RE = re.compile(r"[^A-Za-z0-9_-]+")
+_WS_RE = re.compile(r"\s+")
+
+
+def _safe_name(value: str) -> str:
+    """Filesystem-safe name for an item id: runs of other chars collapse to one "_"."""
+    # Most ids are already safe; skip the regex pass for them.
+    if _SAFE_NAME_CHARS.issuperset(value):
+        return value
+    return _SAFE_NAME_RE.sub("_", value)
 
 
 def _is_http_url(value: str) -> bool:
@@ -40,6 +139,16 @@ def _is_output_url(value: str) -> bool:
     return s.startswith("/outputs/") or s.startswith("outputs/")
 
 
+# Config is frozen, so OUTPUT_DIR can be resolved once. abspath() already normalizes
+# "..", which makes a plain prefix check equivalent to the old commonpath() test.
+_OUTPUT_ROOT = os.path.abspath(config.OUTPUT_DIR)
+_OUTPUT_ROOT_SEP = _OUTPUT_ROOT.rstrip(os.sep) + os.sep
+
+
+def _is_under_output_root(abs_path: str) -> bool:
+    return abs_path == _OUTPUT_ROOT or abs_path.startswith(_OUTPUT_ROOT_SEP)
+
+
 def _output_url_to_local_path(value: str) -> str:
     """Map /outputs/... url to a local file path under OUTPUT_DIR (safe-guarded)."""
     s = (value or "").strip().replace("\\", "/").lstrip("/")
@@ -47,40 +156,292 @@ def _output_url_to_local_path(value: str) -> str:
         return ""
     rel = s[len("outputs/") :]
 
-    output_root = os.path.abspath(config.OUTPUT_DIR)
-    candidate = os.path.abspath(os.path.join(output_root, rel))
-    try:
-        if os.path.commonpath([output_root, candidate]) != output_root:
-            return ""
-    except Exception:
+    candidate = os.path.abspath(os.path.join(_OUTPUT_ROOT, rel))
+    if not _is_under_output_root(candidate):
         return ""
     return candidate
 
 
+def _created_epoch(created_at: Any) -> float:
+    """Parse an ISO ``created_at`` into an epoch float used as the list sort key."""
+    try:
+        return datetime.datetime.fromisoformat(str(created_at or "")).timestamp()
+    except Exception:
+        return 0.0
+
+
 def _job_json_path(output_dir: str) -> str:
     return os.path.join(os.path.abspath(output_dir), _JOB_FILENAME)
 
 
-async def _persist_job(job: Dict[str, Any]) -> None:
+@functools.lru_cache(maxsize=1)
+def _zstd() -> Any:
+    """Return the optional `zstandard` module, or None when not installed."""
+    try:
+        import zstandard  # type: ignore
+    except Exception:
+        return None
+    return zstandard
+
+
+@functools.lru_cache(maxsize=1)
+def _orjson() -> Any:
+    """Return the optional `orjson` module, or None when not installed."""
+    try:
+        import orjson  # type: ignore
+    except Exception:
+        return None
+    return orjson
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON; orjson when available, stdlib otherwise."""
+    oj = _orjson()
+    if oj is not None:
+        return oj.dumps(obj, option=oj.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _json_loads(raw: Any) -> Any:
+    oj = _orjson()
+    return oj.loads(raw) if oj is not None else json.loads(raw)
+
+
+def _items_sidecar_name() -> str:
+    return _ITEMS_FILENAME if _zstd() is not None else _ITEMS_PLAIN_FILENAME
+
+
+def _write_items_sidecar(output_dir: str, items: list) -> str:
+    """Write the full items snapshot (zstd-compressed when available); returns its filename."""
+    raw = _json_dumps(items)
+    name = _items_sidecar_name()
+    zstd = _zstd()
+    if zstd is not None:
+        raw = zstd.ZstdCompressor(level=_ITEMS_ZSTD_LEVEL).compress(raw)
+    path = os.path.join(output_dir, name)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(raw)
+    os.replace(tmp, path)
+    return name
+
+
+def _read_items_sidecar(output_dir: str, filename: str) -> list:
+    name = os.path.basename(filename)
+    with open(os.path.join(output_dir, name), "rb") as f:
+        raw = f.read()
+    if name.endswith(".zst"):
+        zstd = _zstd()
+        if zstd is None:
+            raise RuntimeError("zstandard 未安装，无法读取任务条目")
+        raw = zstd.ZstdDecompressor().decompress(raw)
+    items = _json_loads(raw)
+    return items if isinstance(items, list) else []
+
+
+def _replay_items_log(output_dir: str, items: list) -> None:
+    """Apply items.jsonl updates (in order) on top of the loaded snapshot."""
+    path = os.path.join(output_dir, _ITEMS_LOG_FILENAME)
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        for line in f:
+            try:
+                entry = _json_loads(line)
+            except ValueError:
+                continue  # torn last line after a crash
+            idx = entry.get("i") if isinstance(entry, dict) else None
+            item = entry.get("item") if isinstance(entry, dict) else None
+            if isinstance(idx, int) and 0 <= idx < len(items) and isinstance(item, dict):
+                items[idx] = item
+
+
+class _JobWriteState:
+    """Per job dir: write lock, newest written seqs and the item-log appends since the last items snapshot."""
+
+    __slots__ = ("lock", "header_seq", "items_seq", "log_tail", "__weakref__")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.header_seq = -1
+        self.items_seq = -1
+        self.log_tail: List[Tuple[int, bytes]] = []
+
+
+def _write_state_for(output_dir: str) -> _JobWriteState:
+    with _LOCKS_GUARD:
+        state = _JOB_LOCKS.get(output_dir)
+        if state is None:
+            state = _JobWriteState()
+            _JOB_LOCKS[output_dir] = state
+        return state
+
+
+def _write_job_sync(state: _JobWriteState, snapshot: Dict[str, Any], output_dir: str, seq: int) -> None:
+    """Write a job snapshot (runs in a worker thread; never touches the live job dict).
+
+    When the snapshot carries `items`, the full items sidecar is rewritten and the
+    append-only log is reset; otherwise only the small header is written.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    path = _job_json_path(output_dir)
+    tmp = path + ".tmp"
+    items = snapshot.pop("items", None)
+
+    with state.lock:
+        # Threads may run out of submission order; never overwrite a newer snapshot.
+        if items is not None and seq >= state.items_seq:
+            state.items_seq = seq
+            # Sidecar first so job.json never points at a missing items file.
+            _write_items_sidecar(output_dir, items)
+            _truncate_items_log(state, os.path.join(output_dir, _ITEMS_LOG_FILENAME), seq)
+        if seq < state.header_seq:
+            return
+        state.header_seq = seq
+        snapshot["items_file"] = _items_sidecar_name()
+        with open(tmp, "wb") as f:
+            f.write(_json_dumps(snapshot))
+        os.replace(tmp, path)
+
+
+def _truncate_items_log(state: _JobWriteState, path: str, seq: int) -> None:
+    """Drop log entries covered by the snapshot `seq`; keep appends that raced ahead of it.
+
+    Caller holds state.lock. Appends missing from log_tail finished before this snapshot
+    was submitted (or before a restart, with the log replayed into the job), so it covers them.
+    """
+    pending = [(s, line) for s, line in state.log_tail if s > seq]
+    state.log_tail = pending
+    if not pending:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        return
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.writelines(line for _, line in pending)
+    os.replace(tmp, path)
+
+
+def _append_item_update_sync(
+    state: _JobWriteState, output_dir: str, index: int, item: Dict[str, Any], seq: int
+) -> None:
+    line = _json_dumps({"i": index, "item": item}) + b"\n"
+    path = os.path.join(output_dir, _ITEMS_LOG_FILENAME)
+    with state.lock:
+        # Already covered by a newer full snapshot.
+        if seq < state.items_seq:
+            return
+        with open(path, "ab") as f:
+            f.write(line)
+        state.log_tail.append((seq, line))
+
+
+@functools.lru_cache(maxsize=1)
+def _iso_for_second(second: int) -> str:
+    return datetime.datetime.fromtimestamp(second).isoformat()
+
+
+def _now_iso() -> str:
+    """Local ISO timestamp at 1s granularity; formatted once per second, not per persist."""
+    return _iso_for_second(int(time.time()))
+
+
+async def _persist_job(job: Dict[str, Any], *, include_items: bool = True) -> None:
     """Persist a job state to disk so it survives server restarts."""
     try:
         output_dir = os.path.abspath(job.get("output_dir") or "")
         if not output_dir:
             return
-        os.makedirs(output_dir, exist_ok=True)
-        path = _job_json_path(output_dir)
-        tmp = path + ".tmp"
 
-        job["updated_at"] = datetime.datetime.now().isoformat()
+        job["updated_at"] = _now_iso()
 
-        async with _JOB_SAVE_LOCK:
-            with open(tmp, "w", encoding="utf-8") as f:
-                json.dump(job, f, ensure_ascii=False, separators=(",", ":"))
-            os.replace(tmp, path)
+        # Snapshot on the loop (items are mutated concurrently), serialize + write off-loop.
+        snapshot = {k: v for k, v in job.items() if k != "items"}
+        if include_items:
+            snapshot["items"] = [dict(it) for it in job.get("items") or []]
+        # Write state before the seq: it stays alive until this write lands.
+        state = _write_state_for(output_dir)
+        await asyncio.to_thread(_write_job_sync, state, snapshot, output_dir, next(_PERSIST_SEQ))
     except Exception:
         logger.exception("[StyleBatch] Failed to persist job")
 
 
+async def _persist_item(job: Dict[str, Any], index: int, item: Dict[str, Any]) -> None:
+    """Append one item's current state to items.jsonl instead of rewriting every item."""
+    try:
+        output_dir = os.path.abspath(job.get("output_dir") or "")
+        if not output_dir:
+            return
+        state = _write_state_for(output_dir)
+        await asyncio.to_thread(
+            _append_item_update_sync, state, output_dir, index, dict(item), next(_PERSIST_SEQ)
+        )
+    except Exception:
+        logger.exception("[StyleBatch] Failed to persist job item")
+
+
+# Per-item status changes only mark the job dirty; one writer per running job flushes
+# at most every _PERSIST_DEBOUNCE_SECONDS. Terminal states still persist immediately.
+_PERSIST_DEBOUNCE_SECONDS = 0.5
+_DIRTY_EVENTS: Dict[str, asyncio.Event] = {}
+
+
+def _mark_dirty(job: Dict[str, Any]) -> None:
+    event = _DIRTY_EVENTS.get(str(job.get("id") or ""))
+    if event is not None:
+        event.set()
+
+
+async def _persist_worker(job_id: str, event: asyncio.Event) -> None:
+    while True:
+        await event.wait()
+        await asyncio.sleep(_PERSIST_DEBOUNCE_SECONDS)
+        event.clear()
+        job = STYLE_JOBS.get(job_id)
+        if job is None:
+            return
+        await _persist_job(job, include_items=False)
+
+
+_MAX_LOADED_JOBS = 200
+_LOAD_WORKERS = 16
+
+
+def _read_job_file(job_path: str) -> Optional[Dict[str, Any]]:
+    """Read one persisted job (header + items snapshot + item log); None if unusable."""
+    try:
+        with open(job_path, "rb") as f:
+            job = _json_loads(f.read())
+        if not isinstance(job, dict) or not job.get("id"):
+            return None
+        items_file = job.pop("items_file", None)
+        if items_file and "items" not in job:
+            job["items"] = _read_items_sidecar(os.path.dirname(job_path), str(items_file))
+        items = job.get("items") or []
+        _replay_items_log(os.path.dirname(job_path), items)
+        # The header is flushed on a debounce, the item log on every row: after a crash
+        # the header counters can lag behind, so rebuild them from the replayed items.
+        success_count = sum(1 for it in items if isinstance(it, dict) and it.get("status") == "success")
+        failed_count = sum(1 for it in items if isinstance(it, dict) and it.get("status") == "failed")
+        job["success_count"] = success_count
+        job["failed_count"] = failed_count
+        job["processed"] = success_count + failed_count
+
+        # If the server restarted mid-processing, mark as interrupted.
+        if job.get("status") == "processing":
+            job["status"] = "interrupted"
+        # Older job.json files may still carry the sort key; it lives in _JOB_CREATED_EPOCH now.
+        job.pop("_created_epoch", None)
+        return job
+    except Exception:
+        logger.exception("[StyleBatch] Failed to load job: %s", job_path)
+        return None
+
+
 def _load_existing_jobs() -> None:
     """Load persisted jobs from OUTPUT_DIR/style_*/job.json into memory."""
     try:
@@ -89,62 +450,178 @@ def _load_existing_jobs() -> None:
             return
 
         candidates: list[tuple[float, str]] = []
-        for name in os.listdir(output_root):
-            if not name.startswith("style_"):
-                continue
-            output_dir = os.path.join(output_root, name)
-            job_path = _job_json_path(output_dir)
-            if not os.path.isfile(job_path):
-                continue
-            try:
-                mtime = os.path.getmtime(job_path)
-            except Exception:
-                mtime = 0.0
-            candidates.append((mtime, job_path))
+        # scandir's DirEntry answers is_dir() from the directory listing; one stat per job.json.
+        with os.scandir(output_root) as it:
+            for entry in it:
+                if not entry.name.startswith("style_") or not entry.is_dir():
+                    continue
+                job_path = os.path.join(entry.path, _JOB_FILENAME)
+                try:
+                    st = os.stat(job_path)
+                except OSError:
+                    continue
+                candidates.append((st.st_mtime, job_path))
 
         # Load newest first (cap to avoid huge memory on long-running machines)
         candidates.sort(key=lambda x: x[0], reverse=True)
-        for _, job_path in candidates[:200]:
-            try:
-                with open(job_path, "r", encoding="utf-8") as f:
-                    job = json.load(f)
-                if not isinstance(job, dict) or not job.get("id"):
-                    continue
-
-                # If the server restarted mid-processing, mark as interrupted.
-                if job.get("status") == "processing":
-                    job["status"] = "interrupted"
-
-                STYLE_JOBS[str(job["id"])] = job
-            except Exception:
-                logger.exception("[StyleBatch] Failed to load job: %s", job_path)
+        paths = [p for _, p in candidates[:_MAX_LOADED_JOBS]]
+        if not paths:
+            return
+        # File reads/decompression release the GIL, so loading scales with the pool size.
+        with ThreadPoolExecutor(max_workers=min(_LOAD_WORKERS, len(paths))) as pool:
+            for job in pool.map(_read_job_file, paths):
+                if job is not None:
+                    job_id = str(job["id"])
+                    STYLE_JOBS[job_id] = job
+                    _JOB_CREATED_EPOCH[job_id] = _created_epoch(job.get("created_at"))
     except Exception:
         logger.exception("[StyleBatch] Failed to load existing jobs")
 
 
-def _detect_language(text: str) -> str:
-    s = (text or "").strip()
-    if not s:
-        return "en"
-    if any("\u0E00" <= ch <= "\u0E7F" for ch in s):
+_TH_RE = re.compile("[\u0E00-\u0E7F]")
+_ZH_RE = re.compile("[\u4e00-\u9fff]")
+
+
+@functools.lru_cache(maxsize=4096)
+def _detect_language_cached(s: str) -> str:
+    if _TH_RE.search(s):
         return "th"
-    if any("\u4e00" <= ch <= "\u9fff" for ch in s):
+    if _ZH_RE.search(s):
         return "zh"
     return "en"
 
 
-async def _translate_text(text: str, target_lang: str, source_lang: Optional[str] = None) -> str:
+def _detect_language(text: str) -> str:
+    # Batches repeat the same title/subtitle templates across many rows.
+    return _detect_language_cached(text or "")
+
+
+_LANG_NAMES = {"zh": "中文", "th": "泰语", "en": "英语"}
+# Only ASCII digits/punctuation/whitespace (prices, sizes, dates): identical in every language.
+_ASCII_NON_LETTERS_RE = re.compile(r"[\x00-\x40\x5b-\x60\x7b-\x7f]+")
+
+
+def _has_translatable_text(value: str) -> bool:
+    return _ASCII_NON_LETTERS_RE.fullmatch(value) is None
+
+_TRANSLATE_BATCH_SIZE = 16
+_JSON_OBJECT_RE = re.compile(r"\{[\s\S]*\}")
+
+
+async def _translate_batch(
+    texts: list[str],
+    target_lang: str,
+    source_lang: str,
+    client: Optional[httpx.AsyncClient] = None,
+    *,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    cancelled: Optional[Callable[[], bool]] = None,
+    on_chunk: Optional[Callable[[list[str], dict[str, str]], None]] = None,
+) -> dict[str, str]:
+    """Translate many short strings with one LLM request per chunk of 16.
+
+    Chunks run concurrently (bounded by `semaphore` when given); once `cancelled()`
+    returns True, chunks that have not started are skipped. `on_chunk(chunk, out)` is
+    called as each chunk settles (translated, failed or skipped).
+
+    Returns {原文: 译文} for the entries that came back parsable; callers fall back to
+    `_translate_text` for anything missing (failed chunk / malformed JSON / cancelled).
+    """
+    values = [v for v in dict.fromkeys((t or "").strip() for t in texts) if v]
+    if not values:
+        return {}
+    if target_lang in ("", "same", source_lang):
+        return {v: v for v in values}
+    out: dict[str, str] = {v: v for v in values if not _has_translatable_text(v)}
+    values = [v for v in values if v not in out]
+    if not values:
+        return out
+
+    client = client or _get_shared_client()
+    src_name = _LANG_NAMES.get(source_lang, source_lang)
+    tgt_name = _LANG_NAMES.get(target_lang, target_lang)
+    url = f"{config.get_base_url()}/v1/chat/completions"
+    headers = {
+        "Authorization": f"Bearer {config.get_api_key('flash')}",
+        "Content-Type": "application/json",
+    }
+    model = config.get_model("flash")
+
+    async def _translate_chunk(chunk: list[str]) -> None:
+        try:
+            if semaphore is None:
+                await _request_chunk(chunk)
+                return
+            async with semaphore:
+                await _request_chunk(chunk)
+        finally:
+            if on_chunk is not None:
+                on_chunk(chunk, out)
+
+    async def _request_chunk(chunk: list[str]) -> None:
+        if cancelled is not None and cancelled():
+            return
+        entries = json.dumps([{"i": i, "t": v} for i, v in enumerate(chunk)], ensure_ascii=False)
+        prompt = f"""请将以下电商文案条目从{src_name}翻译成{tgt_name}。
+要求：
+1) 保持意思不变、语气符合电商
+2) 保留专有名词/型号/数字/单位，不要乱改
+3) 只输出 JSON：{{"items": [{{"i": 序号, "t": "译文"}}, ...]}}，序号与原条目一致，不要解释
+
+条目：
+{entries}"""
+        payload = {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0.2,
+            "max_tokens": min(4000, 200 + 200 * len(chunk)),
+            "response_format": {"type": "json_object"},
+        }
+        try:
+            resp = await client.post(url, headers=headers, json=payload, timeout=120.0)
+            if resp.status_code != 200:
+                raise RuntimeError(f"HTTP {resp.status_code}: {resp.text[:200]}")
+            data = resp.json()
+            raw = (data.get("choices") or [{}])[0].get("message", {}).get("content", "") or ""
+            match = _JSON_OBJECT_RE.search(str(raw))
+            parsed = json.loads(match.group()) if match else {}
+            for entry in parsed.get("items") or []:
+                if not isinstance(entry, dict):
+                    continue
+                idx = entry.get("i")
+                translated = str(entry.get("t") or "").strip().strip('"\'“”‘’')
+                if isinstance(idx, int) and 0 <= idx < len(chunk) and translated:
+                    out[chunk[idx]] = translated
+        except Exception as e:
+            logger.warning("[StyleBatch] Batch translation failed (%d items), falling back: %s", len(chunk), e)
+
+    await asyncio.gather(
+        *(
+            _translate_chunk(values[start : start + _TRANSLATE_BATCH_SIZE])
+            for start in range(0, len(values), _TRANSLATE_BATCH_SIZE)
+        )
+    )
+    return out
+
+
+async def _translate_text(
+    text: str,
+    target_lang: str,
+    source_lang: Optional[str] = None,
+    client: Optional[httpx.AsyncClient] = None,
+) -> str:
     value = (text or "").strip()
     if not value:
         return ""
 
+    if target_lang in ("", "same") or not _has_translatable_text(value):
+        return value
     src = source_lang or _detect_language(value)
-    if target_lang in ("", "same", src):
+    if target_lang == src:
         return value
 
-    lang_map = {"zh": "中文", "th": "泰语", "en": "英语"}
-    src_name = lang_map.get(src, src)
-    tgt_name = lang_map.get(target_lang, target_lang)
+    src_name = _LANG_NAMES.get(src, src)
+    tgt_name = _LANG_NAMES.get(target_lang, target_lang)
 
     prompt = f"""请将以下电商文案从{src_name}翻译成{tgt_name}。
 要求：
@@ -169,8 +646,8 @@ async def _translate_text(text: str, target_lang: str, source_lang: Optional[str
         "max_tokens": 400,
     }
 
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        resp = await client.post(url, headers=headers, json=payload)
+    client = client or _get_shared_client()
+    resp = await client.post(url, headers=headers, json=payload)
     if resp.status_code != 200:
         raise RuntimeError(f"翻译失败: HTTP {resp.status_code}: {resp.text}")
 
@@ -179,46 +656,64 @@ async def _translate_text(text: str, target_lang: str, source_lang: Optional[str
     return str(out or "").strip().strip('"\'“”‘’')
 
 
-async def _download_image(url: str, dest_dir: str) -> str:
-    os.makedirs(dest_dir, exist_ok=True)
-
-    async with httpx.AsyncClient(verify=False, follow_redirects=True, timeout=30.0) as client:
-        headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/120.0.0.0 Safari/537.36"
-            ),
-            "Accept": "image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.9,zh-CN;q=0.8,zh;q=0.7",
-        }
-        lower = url.lower()
-        if "shopee" in lower:
-            headers["Referer"] = "https://shopee.tw/"
-        elif "taobao" in lower or "tmall" in lower:
-            headers["Referer"] = "https://www.taobao.com/"
-        elif "jd.com" in lower:
-            headers["Referer"] = "https://www.jd.com/"
-        else:
-            headers["Referer"] = "https://www.google.com/"
-        resp = await client.get(url, headers=headers)
-    if resp.status_code != 200:
-        raise RuntimeError(f"下载图片失败: HTTP {resp.status_code}")
-
-    content_type = resp.headers.get("content-type") or ""
-    ext = mimetypes.guess_extension(content_type.split(";", 1)[0].strip()) or ""
-
-    if not ext:
-        ext = os.path.splitext(url.split("?", 1)[0])[1]
-    if not ext:
-        ext = ".jpg"
-    if ext.lower() not in (".jpg", ".jpeg", ".png", ".webp"):
-        ext = ".jpg"
-
-    filename = f"img_{uuid.uuid4().hex[:10]}{ext}"
-    path = os.path.join(dest_dir, filename)
-    with open(path, "wb") as f:
-        f.write(resp.content)
+_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+_DOWNLOAD_BASE_HEADERS = MappingProxyType(
+    {
+        "User-Agent": (
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+            "AppleWebKit/537.36 (KHTML, like Gecko) "
+            "Chrome/120.0.0.0 Safari/537.36"
+        ),
+        "Accept": "image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8",
+        "Accept-Language": "en-US,en;q=0.9,zh-CN;q=0.8,zh;q=0.7",
+    }
+)
+# (url substring, Referer) — first match wins.
+_REFERER_RULES = (
+    ("shopee", "https://shopee.tw/"),
+    ("taobao", "https://www.taobao.com/"),
+    ("tmall", "https://www.taobao.com/"),
+    ("jd.com", "https://www.jd.com/"),
+)
+_DEFAULT_REFERER = "https://www.google.com/"
+
+
+async def _download_image(url: str, dest_dir: str, client: Optional[httpx.AsyncClient] = None) -> str:
+    import mimetypes
+
+    await asyncio.to_thread(os.makedirs, dest_dir, exist_ok=True)
+
+    client = client or _get_download_client()
+    lower = url.lower()
+    referer = next((r for key, r in _REFERER_RULES if key in lower), _DEFAULT_REFERER)
+    headers = {**_DOWNLOAD_BASE_HEADERS, "Referer": referer}
+    async with client.stream("GET", url, headers=headers) as resp:
+        if resp.status_code != 200:
+            raise RuntimeError(f"下载图片失败: HTTP {resp.status_code}")
+
+        content_type = resp.headers.get("content-type") or ""
+        ext = mimetypes.guess_extension(content_type.split(";", 1)[0].strip()) or ""
+
+        if not ext:
+            ext = os.path.splitext(url.split("?", 1)[0])[1]
+        if not ext:
+            ext = ".jpg"
+        if ext.lower() not in (".jpg", ".jpeg", ".png", ".webp"):
+            ext = ".jpg"
+
+        filename = f"img_{uuid.uuid4().hex[:10]}{ext}"
+        path = os.path.join(dest_dir, filename)
+        # Stream to disk so memory stays flat regardless of image size.
+        try:
+            with open(path, "wb") as f:
+                async for chunk in resp.aiter_bytes(_DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+        except BaseException:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            raise
     return path
 
 
@@ -302,7 +797,7 @@ def _build_generation_prompt(
         parts.append("可加入少量风格化道具点缀，但不能遮挡产品与文字。")
 
     if requirements:
-        clean_req = re.sub(r"\s+", " ", str(requirements)).strip()
+        clean_req = _WS_RE.sub(" ", str(requirements)).strip()
         if clean_req:
             parts.append(f"额外要求：{clean_req}")
 
@@ -312,17 +807,31 @@ def _build_generation_prompt(
 
 
 class BatchStyleManager:
+    _initialized = False
+
+    @classmethod
+    def init(cls) -> None:
+        """Load persisted jobs once; called from the FastAPI startup hook."""
+        if cls._initialized:
+            return
+        cls._initialized = True
+        _load_existing_jobs()
+
     @staticmethod
     def get_job(job_id: str) -> Optional[Dict[str, Any]]:
         return STYLE_JOBS.get(job_id)
 
     @staticmethod
     def list_jobs(limit: int = 50) -> list[dict]:
-        jobs = list(STYLE_JOBS.values())
-        jobs.sort(key=lambda j: str(j.get("created_at") or ""), reverse=True)
+        # Top-N selection keeps this O(N log limit) for large persisted job sets.
+        top = heapq.nlargest(
+            max(1, int(limit or 50)),
+            STYLE_JOBS.values(),
+            key=lambda j: _JOB_CREATED_EPOCH.get(str(j.get("id")), 0.0),
+        )
 
         out: list[dict] = []
-        for job in jobs[: max(1, int(limit or 50))]:
+        for job in top:
             out.append(
                 {
                     "id": job.get("id"),
@@ -381,10 +890,11 @@ class BatchStyleManager:
         output_dir_name = f"style_{job_id[:8]}"
         output_dir = os.path.join(os.path.abspath(config.OUTPUT_DIR), output_dir_name)
 
+        created = datetime.datetime.now()
         job_state: Dict[str, Any] = {
             "id": job_id,
             "status": "pending",
-            "created_at": datetime.datetime.now().isoformat(),
+            "created_at": created.isoformat(),
             "total": len(normalized_items),
             "processed": 0,
             "success_count": 0,
@@ -400,6 +910,7 @@ class BatchStyleManager:
         }
 
         STYLE_JOBS[job_id] = job_state
+        _JOB_CREATED_EPOCH[job_id] = created.timestamp()
         await _persist_job(job_state)
         return job_state
 
@@ -433,14 +944,24 @@ class BatchStyleManager:
         if not job:
             return
 
+        from .replacer import generate_styled_image
+
         output_dir = os.path.abspath(job["output_dir"])
         inputs_dir = os.path.join(output_dir, "_inputs")
-        os.makedirs(output_dir, exist_ok=True)
-        os.makedirs(inputs_dir, exist_ok=True)
+        # Create all per-job dirs up front (off-loop) so items never stall on makedirs.
+        await asyncio.to_thread(os.makedirs, inputs_dir, exist_ok=True)
         await _persist_job(job)
 
+        dirty = _DIRTY_EVENTS[job_id] = asyncio.Event()
+        persist_worker = asyncio.create_task(_persist_worker(job_id, dirty))
+
+        # Separate budgets per stage: downloads/translations are I/O-bound and can run wide,
+        # generation stays capped by the image model's QPS budget.
         max_concurrent = getattr(config, "BATCH_CONCURRENT", 3)
+        download_concurrent = int(getattr(config, "DOWNLOAD_CONCURRENT", 16))
         semaphore = asyncio.Semaphore(max_concurrent)
+        download_sem = asyncio.Semaphore(download_concurrent)
+        translate_sem = asyncio.Semaphore(int(getattr(config, "TRANSLATE_CONCURRENT", 8)))
 
         generation_prompt, copy_style_hint = _build_generation_prompt(
             str(job.get("style_preset") or ""),
@@ -449,55 +970,160 @@ class BatchStyleManager:
             str(job.get("aspect_ratio") or ""),
         )
         target_language = str(job.get("target_language") or "same")
+        llm_client = _get_shared_client()
+        download_client = _get_download_client()
+
+        # Batch-translate all pending titles/subtitles in the background (grouped by detected
+        # source language). Each string gets a future that resolves as soon as its chunk
+        # settles, so rows start downloading right away and only wait on their own chunk;
+        # _translated falls back to a per-string call on misses.
+        translations: dict[tuple[str, str], str] = {}
+        batch_pending: dict[tuple[str, str], asyncio.Future] = {}
+        pretranslate: Optional[asyncio.Future] = None
+        if target_language and target_language != "same":
+            loop = asyncio.get_running_loop()
+            pending_texts: dict[str, list[str]] = {}
+            for it in job.get("items") or []:
+                if it.get("status") in ("success", "failed"):
+                    continue
+                title = str(it.get("title") or "").strip()
+                subtitle = str(it.get("subtitle") or "").strip()
+                src_lang = _detect_language(f"{title} {subtitle}".strip())
+                if src_lang == target_language:
+                    continue
+                for text in (title, subtitle):
+                    if text and (text, src_lang) not in batch_pending:
+                        batch_pending[(text, src_lang)] = loop.create_future()
+                        pending_texts.setdefault(src_lang, []).append(text)
+
+            def _job_cancelled() -> bool:
+                return job.get("status") in ("cancelled", "canceled")
+
+            def _settle(src_lang: str, texts: list[str], out: dict[str, str]) -> None:
+                for text in texts:
+                    future = batch_pending.get((text, src_lang))
+                    if future is not None and not future.done():
+                        future.set_result(out.get(text))
+
+            async def _pretranslate(src_lang: str, texts: list[str]) -> None:
+                out: dict[str, str] = {}
+                try:
+                    out = await _translate_batch(
+                        texts, target_language, src_lang, llm_client,
+                        semaphore=translate_sem, cancelled=_job_cancelled,
+                        on_chunk=functools.partial(_settle, src_lang),
+                    )
+                finally:
+                    # Entries resolved without a request (no translatable text), or left
+                    # over after an error: never leave a row waiting.
+                    _settle(src_lang, texts, out)
 
-        async def process_one(index: int, item: dict) -> None:
-            async with semaphore:
-                if job.get("status") in ("cancelled", "canceled"):
-                    return
-                if item.get("status") in ("success", "failed"):
-                    return
-                item["status"] = "processing"
-                await _persist_job(job)
+            # All chunks of all source languages go out together, bounded by translate_sem.
+            pretranslate = asyncio.gather(
+                *(_pretranslate(src_lang, texts) for src_lang, texts in pending_texts.items())
+            )
 
-                try:
-                    image_url = str(item.get("image_url") or "").strip()
-                    if not image_url:
-                        raise RuntimeError("缺少图片URL")
-
-                    if _is_http_url(image_url):
-                        product_path = await _download_image(image_url, inputs_dir)
-                    elif _is_output_url(image_url):
-                        product_path = _output_url_to_local_path(image_url)
-                        if not product_path or not os.path.exists(product_path):
-                            raise RuntimeError("输出图片不存在")
-                    else:
-                        product_path = os.path.abspath(image_url)
-                        if not os.path.exists(product_path):
-                            raise RuntimeError("本地图片不存在")
-
-                    title = str(item.get("title") or "").strip()
-                    subtitle = str(item.get("subtitle") or "").strip()
+        # Per-job memo of in-flight single translations so duplicate strings across
+        # concurrently processed rows share one LLM call.
+        inflight: dict[tuple[str, str], asyncio.Future] = {}
+
+        async def _translate_limited(text: str, src_lang: str) -> str:
+            async with translate_sem:
+                return await _translate_text(text, target_language, src_lang, llm_client)
+
+        async def _translated(text: str, src_lang: str) -> str:
+            if not text:
+                return ""
+            key = (text, src_lang)
+            cached = translations.get(key)
+            if cached:
+                return cached
+            batched = batch_pending.get(key)
+            if batched is not None:
+                # shield: a cancelled row must not cancel the future other rows share
+                cached = await asyncio.shield(batched)
+                if cached:
+                    translations[key] = cached
+                    return cached
+            pending = inflight.get(key)
+            if pending is None:
+                pending = inflight[key] = asyncio.ensure_future(_translate_limited(text, src_lang))
+            try:
+                translated = await asyncio.shield(pending)
+            except Exception:
+                if inflight.get(key) is pending:
+                    inflight.pop(key, None)
+                raise
+            translations[key] = translated
+            return translated
+
+        async def _resolve_product_path(image_url: str) -> str:
+            if _is_http_url(image_url):
+                async with download_sem:
+                    return await _download_image(image_url, inputs_dir, download_client)
+            if _is_output_url(image_url):
+                product_path = _output_url_to_local_path(image_url)
+                if not product_path or not await asyncio.to_thread(os.path.exists, product_path):
+                    raise RuntimeError("输出图片不存在")
+                return product_path
+            product_path = os.path.abspath(image_url)
+            if not await asyncio.to_thread(os.path.exists, product_path):
+                raise RuntimeError("本地图片不存在")
+            return product_path
 
+        async def process_one(index: int, item: dict) -> None:
+            if job.get("status") in ("cancelled", "canceled"):
+                return
+            if item.get("status") in ("success", "failed"):
+                return
+            item["status"] = "processing"
+            _mark_dirty(job)
+            counted = True
+
+            try:
+                image_url = str(item.get("image_url") or "").strip()
+                if not image_url:
+                    raise RuntimeError("缺少图片URL")
+
+                title = str(item.get("title") or "").strip()
+                subtitle = str(item.get("subtitle") or "").strip()
+
+                src_lang = ""
+                needs_translation = False
+                if target_language and target_language != "same":
+                    src_lang = _detect_language(f"{title} {subtitle}".strip())
+                    needs_translation = target_language != src_lang
+
+                # Image fetch and title/subtitle translation are independent: overlap them.
+                if needs_translation:
+                    product_path, translated_title, translated_subtitle = await asyncio.gather(
+                        _resolve_product_path(image_url),
+                        _translated(title, src_lang),
+                        _translated(subtitle, src_lang),
+                    )
+                    # Translation is only used for image text rendering.
+                    # Do NOT write into new_title/new_subtitle here, otherwise CSV export would overwrite titles.
+                    item["image_title"] = translated_title
+                    if translated_subtitle:
+                        item["image_subtitle"] = translated_subtitle
+                else:
+                    product_path = await _resolve_product_path(image_url)
                     translated_title = title
                     translated_subtitle = subtitle
-                    if target_language and target_language != "same":
-                        src_lang = _detect_language(f"{title} {subtitle}".strip())
-                        if target_language != src_lang:
-                            translated_title = await _translate_text(title, target_language, src_lang) if title else ""
-                            translated_subtitle = await _translate_text(subtitle, target_language, src_lang) if subtitle else ""
-                            # Translation is only used for image text rendering.
-                            # Do NOT write into new_title/new_subtitle here, otherwise CSV export would overwrite titles.
-                            item["image_title"] = translated_title
-                            if translated_subtitle:
-                                item["image_subtitle"] = translated_subtitle
-
-                    custom_text = (translated_title or "").strip()
-                    if translated_subtitle:
-                        custom_text = (custom_text + "\n" + translated_subtitle).strip()
 
-                    safe_name = re.sub(r"[^A-Za-z0-9_-]+", "_", str(item.get("id") or index))
-                    output_path = os.path.join(output_dir, f"{safe_name}_{index+1}.png")
+                custom_text = (translated_title or "").strip()
+                if translated_subtitle:
+                    custom_text = (custom_text + "\n" + translated_subtitle).strip()
 
+                safe_name = _safe_name(str(item.get("id") or index))
+                output_path = os.path.join(output_dir, f"{safe_name}_{index+1}.png")
+
+                async with semaphore:
+                    if job.get("status") in ("cancelled", "canceled"):
+                        # Cancelled while waiting for a generation slot: leave untouched.
+                        item["status"] = "pending"
+                        counted = False
+                        return
                     result = await generate_styled_image(
                         product_image_path=product_path,
                         generation_prompt=generation_prompt,
@@ -506,22 +1132,55 @@ class BatchStyleManager:
                         output_path=output_path,
                     )
 
-                    if not result.get("success"):
-                        raise RuntimeError(result.get("message") or "生成失败")
-
-                    item["status"] = "success"
-                    item["output_path"] = result.get("image_path")
-                    item["output_url"] = _to_output_url(result.get("image_path") or "")
-                    job["success_count"] += 1
-                except Exception as e:
-                    item["status"] = "failed"
-                    item["error"] = str(e)
-                    job["failed_count"] += 1
-                finally:
+                if not result.get("success"):
+                    raise RuntimeError(result.get("message") or "生成失败")
+
+                item["status"] = "success"
+                item["output_path"] = result.get("image_path")
+                item["output_url"] = _to_output_url(result.get("image_path") or "")
+                job["success_count"] += 1
+            except Exception as e:
+                item["status"] = "failed"
+                item["error"] = str(e)
+                job["failed_count"] += 1
+            finally:
+                if counted:
                     job["processed"] += 1
-                    await _persist_job(job)
+                    await _persist_item(job, index, item)
+                _mark_dirty(job)
 
-        await asyncio.gather(*[process_one(i, it) for i, it in enumerate(job.get("items") or [])])
+        # Bounded producer: only spawn a row once a window slot frees up, so a large job
+        # never holds one pending coroutine per row. The window covers the generation slots
+        # plus the download budget so the next rows keep prefetching while images generate.
+        window = asyncio.Semaphore(max_concurrent + download_concurrent)
+        tasks: set[asyncio.Task] = set()
+
+        async def _run_windowed(index: int, item: dict) -> None:
+            try:
+                await process_one(index, item)
+            finally:
+                window.release()
+
+        try:
+            for i, it in enumerate(job.get("items") or []):
+                if it.get("status") in ("success", "failed"):
+                    continue
+                await window.acquire()
+                if job.get("status") in ("cancelled", "canceled"):
+                    window.release()
+                    break
+                task = asyncio.create_task(_run_windowed(i, it))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            if pretranslate is not None:
+                pretranslate.cancel()
+            persist_worker.cancel()
+            _DIRTY_EVENTS.pop(job_id, None)
 
         if job.get("status") not in ("cancelled", "canceled"):
             job["status"] = "completed"
@@ -529,16 +1188,13 @@ class BatchStyleManager:
 
 
 def _to_output_url(path: str) -> str:
-    try:
-        output_root = os.path.abspath(config.OUTPUT_DIR)
-        abs_path = os.path.abspath(path)
-        if os.path.commonpath([output_root, abs_path]) != output_root:
-            return ""
-        rel = os.path.relpath(abs_path, output_root)
-        return "/outputs/" + rel.replace(os.sep, "/")
-    except Exception:
+    if not path:
+        return ""
+    abs_path = os.path.abspath(path)
+    if not _is_under_output_root(abs_path) or abs_path == _OUTPUT_ROOT:
         return ""
+    rel = abs_path[len(_OUTPUT_ROOT_SEP) :]
+    return "/outputs/" + rel.replace(os.sep, "/")
 
 
 style_batch_manager = BatchStyleManager()
-_load_existing_jobs()
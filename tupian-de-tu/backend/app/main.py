@@ -3,6 +3,7 @@ Xobi - 表格驱动的电商图像自动化流水线
 FastAPI 主入口
 # Reload: 2026-01-19
 """
+import asyncio
 import os
 import logging
 from logging.handlers import RotatingFileHandler
@@ -59,6 +60,8 @@ from .api import (
     vision_annotate,
 )
 from .config import config
+from .utils.response import JSONResponse as FastJSONResponse
+from .core.style_batch import close_shared_clients, style_batch_manager
 from .middleware.config_middleware import DynamicConfigMiddleware
 
 
@@ -70,8 +73,11 @@ async def lifespan(app: FastAPI):
     os.makedirs(os.path.abspath(config.OUTPUT_DIR), exist_ok=True)
     logger.info(f"输入目录: {os.path.abspath(config.INPUT_DIR)}")
     logger.info(f"输出目录: {os.path.abspath(config.OUTPUT_DIR)}")
+    # 加载持久化的风格批量任务（不再在模块导入时执行；磁盘 I/O 放到线程中，不阻塞事件循环）
+    await asyncio.to_thread(style_batch_manager.init)
     logger.info("Xobi 服务已启动")
     yield
+    await close_shared_clients()
     logger.info("Xobi 服务已关闭")
 
 
@@ -88,6 +94,7 @@ app = FastAPI(
     - Gemini Image 高质量图片生成
     """,
     version="2.0.0",
+    default_response_class=FastJSONResponse,
     lifespan=lifespan
 )
 
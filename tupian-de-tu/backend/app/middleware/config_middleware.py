@@ -2,10 +2,19 @@
 Dynamic Config Middleware - 从请求头提取 API 配置并注入到上下文
 """
 
+import logging
+
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from ..config import set_runtime_config, _normalize_yunwu_base_url
 
+logger = logging.getLogger(__name__)
+
+# 静态资源 / 健康检查不会调用 API，无需解析运行时配置
+# （/health 精确匹配，避免误伤 /healthcheck、/health-report 之类的业务路由）
+_SKIP_PREFIXES = ("/outputs/", "/static/", "/favicon")
+_SKIP_PATHS = frozenset(("/health", "/health/"))
+
 
 class DynamicConfigMiddleware(BaseHTTPMiddleware):
     """
@@ -19,6 +28,10 @@ class DynamicConfigMiddleware(BaseHTTPMiddleware):
     """
 
     async def dispatch(self, request: Request, call_next):
+        path = request.url.path
+        if path in _SKIP_PATHS or path.startswith(_SKIP_PREFIXES):
+            return await call_next(request)
+
         # 提取自定义配置头（请求头名称不区分大小写）
         runtime_config = {}
 
@@ -39,12 +52,12 @@ class DynamicConfigMiddleware(BaseHTTPMiddleware):
             normalized = _normalize_yunwu_base_url(base_url)
             if normalized:
                 runtime_config['yunwu_base_url'] = normalized
-                print(f"[Config Middleware] Base URL normalized: {request.headers.get('x-yunwu-base-url')} -> {normalized}")
+                logger.debug("[Config Middleware] Base URL normalized: %s -> %s", base_url, normalized)
 
         # 注入到上下文（如果有配置的话）
         if runtime_config:
             set_runtime_config(runtime_config)
-            print(f"[Config Middleware] Runtime config injected: {list(runtime_config.keys())}")
+            logger.debug("[Config Middleware] Runtime config injected: %s", list(runtime_config))
 
         response = await call_next(request)
         return response
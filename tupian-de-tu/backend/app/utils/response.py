@@ -3,7 +3,26 @@ Unified response format utilities for FastAPI
 与 xobixiangqing/backend/utils/response.py 保持一致的响应格式
 """
 from typing import Any, Optional
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse as _StdJSONResponse
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # 可选依赖，未安装时退回标准库 json
+    orjson = None
+
+_ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson is not None else 0
+
+
+class JSONResponse(_StdJSONResponse):
+    """JSONResponse rendered with orjson when available (falls back to stdlib json)."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            try:
+                return orjson.dumps(content, option=_ORJSON_OPTIONS)
+            except TypeError:
+                pass
+        return super().render(content)
 
 
 def success_response(
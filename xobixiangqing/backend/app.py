@@ -6,18 +6,18 @@ import sys
 import logging
 from pathlib import Path
 from dotenv import load_dotenv
-from sqlalchemy import event
-from sqlalchemy.engine import Engine
+from urllib.parse import quote
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.engine import Engine, make_url
 import sqlite3
 from sqlalchemy.exc import SQLAlchemyError
-from flask_migrate import Migrate
 
 # Load environment variables from project root .env file
 _project_root = Path(__file__).parent.parent
 _env_file = _project_root / '.env'
 load_dotenv(dotenv_path=_env_file, override=True)
 
-from flask import Flask
+from flask import Flask, g
 from flask_cors import CORS
 from models import db
 from config import Config
@@ -28,11 +28,22 @@ from controllers.logs_controller import logs_bp
 from controllers import project_bp, project_settings_bp, module_settings_bp, page_bp, template_bp, user_template_bp, export_bp, file_bp, assets_bp, jobs_bp, dataset_bp, tools_bp, agent_bp, ai_bp, auth_bp, admin_bp
 
 
+_SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL;"
+    "PRAGMA synchronous=NORMAL;"
+    "PRAGMA busy_timeout=30000;"  # 30 seconds timeout
+    "PRAGMA cache_size=-64000;"  # 64 MB page cache
+    "PRAGMA temp_store=MEMORY;"
+    "PRAGMA mmap_size=268435456;"  # 256 MB memory-mapped reads
+)
+
+
 # Enable SQLite WAL mode for all connections
 @event.listens_for(Engine, "connect")
 def set_sqlite_pragma(dbapi_conn, connection_record):
     """
-    Enable WAL mode and related PRAGMAs for each SQLite connection.
+    Enable WAL mode and related PRAGMAs (page cache, in-memory temp store,
+    mmap reads) for each SQLite connection.
     Registered once at import time to avoid duplicate handlers when
     create_app() is called multiple times.
     """
@@ -40,55 +51,48 @@ def set_sqlite_pragma(dbapi_conn, connection_record):
     if not isinstance(dbapi_conn, sqlite3.Connection):
         return
 
-    cursor = dbapi_conn.cursor()
+    # One batch instead of a Python round-trip per PRAGMA.
+    dbapi_conn.executescript(_SQLITE_PRAGMAS)
+
+
+def _sqlite_readonly_bind(database_uri, pool_size):
+    """
+    Build the `readonly` bind for a file-based SQLite database: a separate
+    read-only (mode=ro) engine with its own pool, so read endpoints don't
+    contend with writers for pooled connections. None for other databases.
+    """
     try:
-        cursor.execute("PRAGMA journal_mode=WAL")
-        cursor.execute("PRAGMA synchronous=NORMAL")
-        cursor.execute("PRAGMA busy_timeout=30000")  # 30 seconds timeout
-    finally:
-        cursor.close()
+        url = make_url(database_uri)
+    except Exception:
+        return None
+    db_file = url.database or ''
+    if url.get_backend_name() != 'sqlite' or not db_file or db_file == ':memory:' or db_file.startswith('file:'):
+        return None
+    db_file = Path(os.path.abspath(db_file)).as_posix()
+    return {
+        'url': f"sqlite:///file:{quote(db_file)}?mode=ro&uri=true",
+        'pool_size': pool_size,
+    }
 
 
-def create_app():
-    """Application factory"""
-    app = Flask(__name__)
-    
-    # Load configuration from Config class
-    app.config.from_object(Config)
-    
-    # Override with environment-specific paths (use absolute path)
-    backend_dir = os.path.dirname(os.path.abspath(__file__))
-    instance_dir = os.path.join(backend_dir, 'instance')
-    os.makedirs(instance_dir, exist_ok=True)
-    
-    db_path = os.path.join(instance_dir, 'database.db')
-    # Respect DATABASE_URL / testing overrides; only fallback to the default instance DB when not configured.
-    is_testing = str(os.getenv("TESTING", "")).strip().lower() in ("1", "true", "yes")
-    database_url = os.getenv("DATABASE_URL")
-    if database_url:
-        app.config["SQLALCHEMY_DATABASE_URI"] = database_url
-    elif not is_testing:
-        app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
-    
-    # Ensure upload folder exists (use backend/uploads to match run.bat)
-    upload_folder = os.path.join(backend_dir, 'uploads')
-    os.makedirs(upload_folder, exist_ok=True)
-    app.config['UPLOAD_FOLDER'] = upload_folder
-    
-    # CORS configuration (parse from environment)
-    raw_cors = os.getenv('CORS_ORIGINS', 'http://localhost:3000')
-    if raw_cors.strip() == '*':
-        cors_origins = '*'
-    else:
-        cors_origins = [o.strip() for o in raw_cors.split(',') if o.strip()]
-    app.config['CORS_ORIGINS'] = cors_origins
-    
-    # Initialize logging (log to stdout and file)
-    log_level = getattr(logging, app.config['LOG_LEVEL'], logging.INFO)
-    log_format = "%(asctime)s [%(levelname)s] %(name)s - %(message)s"
+_logging_configured = False
+
+
+def _configure_logging(level_name, log_dir):
+    """
+    Attach console + rotating file handlers to the root logger.
+    Runs once per process so repeated create_app() calls (tests) don't stack
+    duplicate handlers and emit every log line N times.
+    """
+    global _logging_configured
+    if _logging_configured:
+        return
+    _logging_configured = True
+
+    log_level = getattr(logging, level_name, logging.INFO)
+    formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(name)s - %(message)s")
 
     # 日志文件路径
-    log_dir = os.path.join(backend_dir, 'logs')
     os.makedirs(log_dir, exist_ok=True)
     log_file = os.path.join(log_dir, 'xobi_a.log')
 
@@ -98,7 +102,7 @@ def create_app():
 
     # 控制台输出
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(logging.Formatter(log_format))
+    console_handler.setFormatter(formatter)
     root_logger.addHandler(console_handler)
 
     # 文件输出（带日志轮转，最大 10MB，保留 5 个备份）
@@ -106,11 +110,11 @@ def create_app():
     file_handler = RotatingFileHandler(
         log_file, maxBytes=10*1024*1024, backupCount=5, encoding='utf-8'
     )
-    file_handler.setFormatter(logging.Formatter(log_format))
+    file_handler.setFormatter(formatter)
     root_logger.addHandler(file_handler)
 
     logging.info(f"日志文件: {log_file}")
-    
+
     # 设置第三方库的日志级别，避免过多的DEBUG日志
     logging.getLogger('sqlalchemy.engine').setLevel(logging.WARNING)
     logging.getLogger('httpcore').setLevel(logging.WARNING)
@@ -118,11 +122,56 @@ def create_app():
     logging.getLogger('urllib3').setLevel(logging.WARNING)
     logging.getLogger('werkzeug').setLevel(logging.INFO)  # Flask开发服务器日志保持INFO
 
+
+def create_app():
+    """Application factory"""
+    app = Flask(__name__)
+
+    # orjson 可用时用它编码/解析所有 JSON 响应与请求体
+    from utils import json_provider
+    if json_provider.orjson is not None:
+        app.json = json_provider.ORJSONProvider(app)
+    
+    # Load configuration from Config class
+    app.config.from_object(Config)
+    
+    # Override with environment-specific paths (use absolute path)
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    instance_dir = os.path.join(backend_dir, 'instance')
+    os.makedirs(instance_dir, exist_ok=True)
+    
+    db_path = os.path.join(instance_dir, 'database.db')
+    # Respect DATABASE_URL / testing overrides; only fallback to the default instance DB when not configured.
+    is_testing = str(os.getenv("TESTING", "")).strip().lower() in ("1", "true", "yes")
+    database_url = os.getenv("DATABASE_URL")
+    if database_url:
+        app.config["SQLALCHEMY_DATABASE_URI"] = database_url
+    elif not is_testing:
+        app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+
+    readonly_bind = _sqlite_readonly_bind(app.config['SQLALCHEMY_DATABASE_URI'], app.config['SQLITE_READ_POOL_SIZE'])
+    if readonly_bind:
+        app.config['SQLALCHEMY_BINDS'] = {'readonly': readonly_bind}
+    
+    # Ensure upload folder exists (use backend/uploads to match run.bat)
+    upload_folder = os.path.join(backend_dir, 'uploads')
+    os.makedirs(upload_folder, exist_ok=True)
+    app.config['UPLOAD_FOLDER'] = upload_folder
+    
+    # CORS configuration (parsed once at import in Config.CORS_ORIGINS)
+    cors_origins = Config.CORS_ORIGINS
+
+    # Initialize logging (log to stdout and file) - once per process
+    _configure_logging(app.config['LOG_LEVEL'], os.path.join(backend_dir, 'logs'))
+
     # Initialize extensions
     db.init_app(app)
     CORS(app, origins=cors_origins)
-    # Database migrations (Alembic via Flask-Migrate)
-    Migrate(app, db)
+    # Database migrations (Alembic via Flask-Migrate): only needed for `flask db ...`;
+    # HTTP workers skip importing Alembic/Mako
+    if _running_flask_cli():
+        from flask_migrate import Migrate
+        Migrate(app, db)
     
     # Register blueprints
     app.register_blueprint(project_bp)
@@ -148,13 +197,27 @@ def create_app():
     app.register_blueprint(admin_bp)
 
     with app.app_context():
-        # Create all database tables if they don't exist
-        db.create_all()
+        # Create only the missing tables (one schema listing instead of a create_all probe per
+        # table); columns of existing tables are managed by `flask db upgrade` (run.sh / run.bat / Dockerfile)
+        tables = _tables_to_create()
+        if tables is None:
+            db.create_all()
+        elif tables:
+            logging.info(f"Creating missing tables: {', '.join(t.name for t in tables)}")
+            db.metadata.create_all(bind=db.engine, tables=tables)
         # Load settings from database and sync to app.config
         _load_settings_to_config(app)
         # Initialize default admin user if not exists
         _init_default_admin()
 
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create missing database tables and initialize default settings/admin."""
+        db.create_all()
+        _load_settings_to_config(app)
+        _init_default_admin()
+        logging.info("Database tables created")
+
     # Health check endpoint
     @app.route('/health')
     def health_check():
@@ -167,13 +230,10 @@ def create_app():
         获取用户的输出语言偏好（从数据库 Settings 读取）
         返回: zh, ja, en, auto
         """
-        from models import Settings
-        try:
-            settings = Settings.get_settings()
-            return {'data': {'language': settings.output_language}}
-        except SQLAlchemyError as db_error:
-            logging.warning(f"Failed to load output language from settings: {db_error}")
+        settings = _request_settings()
+        if settings is None:
             return {'data': {'language': Config.OUTPUT_LANGUAGE}}  # 默认中文
+        return {'data': {'language': settings.output_language}}
 
     # Root endpoint
     @app.route('/')
@@ -192,6 +252,52 @@ def create_app():
     return app
 
 
+def _request_settings():
+    """
+    Settings snapshot for the current request (TTL-cached; see Settings.get_cached_settings),
+    loaded on first use only so endpoints that never read settings skip the lookup.
+    Returns None when the settings row cannot be loaded.
+    """
+    if 'settings' not in g:
+        from models import Settings
+        try:
+            g.settings = Settings.get_cached_settings()
+        except SQLAlchemyError as db_error:
+            logging.warning(f"Failed to load settings snapshot: {db_error}")
+            db.session.rollback()
+            g.settings = None
+    return g.settings
+
+
+def _running_flask_cli():
+    """True when started via the `flask` CLI (`flask ...` / `python -m flask ...`) or FLASK_CLI=1."""
+    if os.getenv('FLASK_CLI', '').strip().lower() in ('1', 'true', 'yes'):
+        return True
+    prog = sys.argv[0] if sys.argv else ''
+    return os.path.basename(prog) in ('flask', 'flask.exe') or prog.endswith(os.path.join('flask', '__main__.py'))
+
+
+def _tables_to_create():
+    """
+    Tables to create on startup: None for a full create_all, otherwise the model
+    tables missing from the database (empty when the schema is complete).
+    XOBI_AUTO_CREATE_TABLES=1/0 forces a full create_all / disables it.
+    Several tables (users, jobs, assets, datasets, ...) have no migration and only
+    ever come from here, so a model added later still gets its table on the next boot.
+    """
+    flag = os.getenv('XOBI_AUTO_CREATE_TABLES', '').strip().lower()
+    if flag in ('1', 'true', 'yes'):
+        return None
+    if flag in ('0', 'false', 'no'):
+        return []
+    try:
+        existing = set(sa_inspect(db.engine).get_table_names())
+    except SQLAlchemyError as e:
+        logging.warning(f"Could not inspect database schema: {e}")
+        return None
+    return [table for name, table in db.metadata.tables.items() if name not in existing]
+
+
 def _load_settings_to_config(app):
     """Load settings from database and apply to app.config on startup"""
     from models import Settings
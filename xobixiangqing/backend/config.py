@@ -11,6 +11,14 @@ _current_file = os.path.realpath(__file__)  # 使用realpath解析所有符号
 BASE_DIR = os.path.dirname(_current_file)
 PROJECT_ROOT = os.path.dirname(BASE_DIR)
 
+
+def _parse_cors_origins(raw):
+    """'*' 保持通配；否则解析为去空白后的 origin 元组（导入时解析一次）"""
+    if raw.strip() == '*':
+        return '*'
+    return tuple(o.strip() for o in raw.split(',') if o.strip())
+
+
 # Flask配置
 class Config:
     """Base configuration"""
@@ -68,6 +76,9 @@ class Config:
             'pool_recycle': 3600,
         }
 
+    # SQLite 只读连接池大小（只读查询走独立的 readonly bind，WAL 下可与写连接并行）
+    SQLITE_READ_POOL_SIZE = int(os.getenv('SQLITE_READ_POOL_SIZE', str(os.cpu_count() or 4)))
+
     # Cloudflare R2 对象存储配置
     R2_ENABLED = os.getenv('R2_ENABLED', 'false').lower() in ('1', 'true', 'yes')
     R2_ACCOUNT_ID = os.getenv('R2_ACCOUNT_ID', '')
@@ -79,8 +90,8 @@ class Config:
     # 文件存储配置
     UPLOAD_FOLDER = os.path.join(BASE_DIR, 'uploads')
     MAX_CONTENT_LENGTH = 200 * 1024 * 1024  # 200MB max file size
-    ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp', 'bmp', 'svg', 'tiff', 'tif', 'ico', 'heic', 'heif', 'avif', 'jfif'}
-    ALLOWED_REFERENCE_FILE_EXTENSIONS = {'pdf', 'docx', 'doc', 'xlsx', 'xls', 'csv', 'txt', 'md', 'pptx', 'ppt'}
+    ALLOWED_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'gif', 'webp', 'bmp', 'svg', 'tiff', 'tif', 'ico', 'heic', 'heif', 'avif', 'jfif'})
+    ALLOWED_REFERENCE_FILE_EXTENSIONS = frozenset({'pdf', 'docx', 'doc', 'xlsx', 'xls', 'csv', 'txt', 'md', 'pptx', 'ppt'})
     
     # AI服务配置
     GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY', '')
@@ -126,6 +137,12 @@ class Config:
     CANVAS_IMAGE_MAX_CONCURRENCY = int(os.getenv("CANVAS_IMAGE_MAX_CONCURRENCY", "0"))  # 0=auto
     CANVAS_IMAGE_TIMEOUT = float(os.getenv("CANVAS_IMAGE_TIMEOUT", "120.0"))  # seconds
     CANVAS_IMAGE_MAX_RETRIES = int(os.getenv("CANVAS_IMAGE_MAX_RETRIES", "0"))
+    # 画布参考图解码/PNG 落盘共享线程池大小（所有请求共用，避免每个请求各开线程）
+    CANVAS_GLOBAL_IMAGE_WORKERS = int(os.getenv("CANVAS_GLOBAL_IMAGE_WORKERS", "16"))
+    # 画布生图结果缓存秒数：同一 prompt/参考图/比例/序号在 TTL 内直接复用已生成的图片；默认 0=关闭（“再来一张”应出新图）
+    CANVAS_IMAGE_CACHE_TTL = float(os.getenv("CANVAS_IMAGE_CACHE_TTL", "0"))
+    # 画布/AI 接口结果落盘用 zlib level 1（默认 6 在大图上要耗数秒 CPU），文件略大但仍为无损 PNG
+    CANVAS_FAST_PNG = os.getenv("CANVAS_FAST_PNG", "true").lower() in ("1", "true", "yes")
     
     # 图片生成配置
     DEFAULT_ASPECT_RATIO = "3:4"
@@ -135,7 +152,7 @@ class Config:
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
     
     # CORS配置
-    CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:3000').split(',')
+    CORS_ORIGINS = _parse_cors_origins(os.getenv('CORS_ORIGINS', 'http://localhost:3000'))
     
     # 输出语言配置
     # 可选值: 'zh' (中文), 'ja' (日本語), 'en' (English), 'auto' (自动)
@@ -6,7 +6,8 @@ from .page_controller import page_bp
 from .template_controller import template_bp, user_template_bp
 from .export_controller import export_bp
 from .file_controller import file_bp
-from .material_controller import material_bp
+from .material_controller import material_bp, material_global_bp
+from .reference_file_controller import reference_file_bp
 from .settings_controller import settings_bp
 from .assets_controller import assets_bp
 from .jobs_controller import jobs_bp
@@ -29,6 +30,8 @@ __all__ = [
     'export_bp',
     'file_bp',
     'material_bp',
+    'material_global_bp',
+    'reference_file_bp',
     'settings_bp',
     'assets_bp',
     'jobs_bp',
@@ -1,15 +1,162 @@
 """Admin controller - user management CRUD"""
 import logging
+import time
 from datetime import datetime, timezone
+from typing import Any, Optional
 
 from flask import Blueprint, request, jsonify
-from models import db, User
+from pydantic import BaseModel, ConfigDict, ValidationError, field_validator
+from sqlalchemy import func, select
+from models import db, User, read_bind_arguments
 from utils.auth import hash_password, admin_required, get_current_user
 
+try:
+    import ciso8601  # 可选：C 实现的 ISO-8601 解析，原生支持 'Z'
+except ImportError:
+    ciso8601 = None
+
 logger = logging.getLogger(__name__)
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
 
+# 无过滤条件时的用户总数缓存 (expires_at, total)，避免每次翻页都全表 COUNT；
+# 管理端增删用户时立即失效，其它入口（注册）最多滞后 TTL 秒
+_USER_COUNT_TTL = 5.0
+_user_count_cache = (0.0, 0)
+
+
+def _cached_user_count(bind_arguments):
+    global _user_count_cache
+    now = time.monotonic()
+    expires_at, total = _user_count_cache
+    if expires_at > now:
+        return total
+    total = db.session.scalar(select(func.count(User.id)), bind_arguments=bind_arguments) or 0
+    _user_count_cache = (now + _USER_COUNT_TTL, total)
+    return total
+
+
+# 列表接口只取 to_dict() 需要的列，按行直接组装，跳过 ORM 实例构建
+_USER_LIST_COLUMNS = (
+    User.id, User.username, User.role, User.status, User.quota,
+    User.expires_at, User.created_at, User.updated_at, User.last_login_at,
+)
+_USER_DATETIME_FIELDS = ('expires_at', 'created_at', 'updated_at', 'last_login_at')
+
+
+def _user_row_to_dict(row):
+    """Same shape as User.to_dict() for a row selected with _USER_LIST_COLUMNS."""
+    data = row._asdict()
+    for key in _USER_DATETIME_FIELDS:
+        value = data[key]
+        data[key] = value.isoformat() if value else None
+    return data
+
+
+def _parse_iso_datetime(value):
+    """Parse an ISO-8601 string (e.g. 2025-12-31T00:00:00Z); raises ValueError."""
+    if ciso8601 is not None:
+        return ciso8601.parse_datetime(value)
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _invalidate_user_count():
+    global _user_count_cache
+    _user_count_cache = (0.0, 0)
+
+
+# 请求体 schema：一次校验替代逐字段 if 判断；字段声明顺序即报错优先级。
+# 校验器一律 mode='before'，在 pydantic 类型校验之前给出原有的中文文案（如 role: null）
+def _check_role(value):
+    if value not in ('admin', 'user'):
+        raise ValueError('角色必须是 admin 或 user')
+    return value
+
+
+def _check_status(value):
+    if value not in ('active', 'disabled'):
+        raise ValueError('状态必须是 active 或 disabled')
+    return value
+
+
+def _parse_expires_at(value, message):
+    """Empty -> None; otherwise an ISO-8601 datetime, raising ValueError(message) when unparsable."""
+    if not value:
+        return None
+    try:
+        return _parse_iso_datetime(value)
+    except (AttributeError, TypeError, ValueError):
+        raise ValueError(message) from None
+
+
+class _UserCreate(BaseModel):
+    """expires_at stays raw here: it is parsed after the duplicate-username check, as before."""
+
+    model_config = ConfigDict(validate_default=True)
+
+    username: str = ''
+    password: str = ''
+    role: str = 'user'
+    status: str = 'active'
+    quota: Any = None
+    expires_at: Any = None
+
+    @field_validator('username', mode='before')
+    @classmethod
+    def _username(cls, value):
+        if value is None:
+            value = ''
+        if isinstance(value, str):
+            value = value.strip()
+            if not value:
+                raise ValueError('用户名不能为空')
+            if len(value) < 3:
+                raise ValueError('用户名长度不能少于3位')
+        return value
+
+    @field_validator('password', mode='before')
+    @classmethod
+    def _password(cls, value):
+        if not value:
+            raise ValueError('密码不能为空')
+        if isinstance(value, str) and len(value) < 6:
+            raise ValueError('密码长度不能少于6位')
+        return value
+
+    _role = field_validator('role', mode='before')(_check_role)
+    _status = field_validator('status', mode='before')(_check_status)
+
+
+class _UserUpdate(BaseModel):
+    """All fields optional; model_fields_set tells which ones were sent."""
+
+    role: Optional[str] = None
+    status: Optional[str] = None
+    quota: Any = None
+    expires_at: Optional[datetime] = None
+
+    _role = field_validator('role', mode='before')(_check_role)
+    _status = field_validator('status', mode='before')(_check_status)
+
+    @field_validator('expires_at', mode='before')
+    @classmethod
+    def _expires_at(cls, value):
+        return _parse_expires_at(value, '到期时间格式错误')
+
+
+# 校验器之外的类型错误（如 username 传了数字）也按字段给中文提示
+_FIELD_LABELS = {'username': '用户名', 'password': '密码', 'role': '角色', 'status': '状态', 'expires_at': '到期时间'}
+
+
+def _validation_message(exc):
+    """First schema error as a user-facing (Chinese) message."""
+    err = exc.errors()[0]
+    cause = (err.get('ctx') or {}).get('error')
+    if cause is not None:
+        return str(cause)
+    field = err['loc'][0] if err['loc'] else ''
+    return f"{_FIELD_LABELS.get(field, field)}格式错误"
+
 
 @admin_bp.route('/users', methods=['GET'])
 @admin_required
@@ -30,26 +177,51 @@ def list_users():
     role = request.args.get('role', '')
     keyword = request.args.get('keyword', '').strip()
 
-    query = User.query
+    page = max(page, 1)
+    if size < 1:
+        size = 20
+
+    stmt = select(*_USER_LIST_COLUMNS)
 
     if status:
-        query = query.filter_by(status=status)
+        stmt = stmt.filter_by(status=status)
     if role:
-        query = query.filter_by(role=role)
+        stmt = stmt.filter_by(role=role)
     if keyword:
-        query = query.filter(User.username.ilike(f'%{keyword}%'))
-
-    query = query.order_by(User.created_at.desc())
-
-    pagination = query.paginate(page=page, per_page=size, error_out=False)
-    users = [u.to_dict() for u in pagination.items]
+        # 子串匹配（前后都有 %）：B-tree 索引（含 lower(username)）无法服务前导通配，
+        # 改成前缀匹配会改变搜索语义，故保持全表扫描；users 表只有管理员账号量级
+        stmt = stmt.filter(User.username.ilike(f'%{keyword}%'))
+
+    # 只读查询走 readonly 连接池；纯读取无需先 flush session 中的待写入对象
+    bind_arguments = read_bind_arguments()
+    offset = (page - 1) * size
+    with db.session.no_autoflush:
+        # 多取一条判断是否有下一页
+        rows = db.session.execute(
+            stmt.order_by(User.created_at.desc()).limit(size + 1).offset(offset),
+            bind_arguments=bind_arguments,
+        ).all()
+        has_next = len(rows) > size
+        rows = rows[:size]
+
+        if not (status or role or keyword):
+            total = _cached_user_count(bind_arguments)
+        elif has_next or (offset and not rows):
+            total = db.session.scalar(
+                select(func.count()).select_from(stmt.subquery()), bind_arguments=bind_arguments
+            ) or 0
+        else:
+            # 最后一页：总数可直接推出，无需 COUNT
+            total = offset + len(rows)
+    users = [_user_row_to_dict(r) for r in rows]
 
     return jsonify({
         'users': users,
-        'total': pagination.total,
+        'total': total,
         'page': page,
         'size': size,
-        'pages': pagination.pages,
+        'pages': -(-total // size),
+        'has_next': has_next,
     })
 
 
@@ -72,50 +244,35 @@ def create_user():
     if not data:
         return jsonify({'error': '请求体不能为空'}), 400
 
-    username = data.get('username', '').strip()
-    password = data.get('password', '')
-    role = data.get('role', 'user')
-    status = data.get('status', 'active')
-    quota = data.get('quota')
-    expires_at_str = data.get('expires_at')
-
     # 验证
-    if not username:
-        return jsonify({'error': '用户名不能为空'}), 400
-    if len(username) < 3:
-        return jsonify({'error': '用户名长度不能少于3位'}), 400
-    if not password:
-        return jsonify({'error': '密码不能为空'}), 400
-    if len(password) < 6:
-        return jsonify({'error': '密码长度不能少于6位'}), 400
-    if role not in ('admin', 'user'):
-        return jsonify({'error': '角色必须是 admin 或 user'}), 400
-    if status not in ('active', 'disabled'):
-        return jsonify({'error': '状态必须是 active 或 disabled'}), 400
+    try:
+        body = _UserCreate.model_validate(data)
+    except ValidationError as e:
+        return jsonify({'error': _validation_message(e)}), 400
+    username = body.username
 
     # 检查用户名是否已存在
     if User.query.filter_by(username=username).first():
         return jsonify({'error': '用户名已存在'}), 400
 
     # 解析到期时间
-    expires_at = None
-    if expires_at_str:
-        try:
-            expires_at = datetime.fromisoformat(expires_at_str.replace('Z', '+00:00'))
-        except ValueError:
-            return jsonify({'error': '到期时间格式错误，请使用 ISO 格式'}), 400
+    try:
+        expires_at = _parse_expires_at(body.expires_at, '到期时间格式错误，请使用 ISO 格式')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
     # 创建用户
     user = User(
         username=username,
-        password_hash=hash_password(password),
-        role=role,
-        status=status,
-        quota=quota,
+        password_hash=hash_password(body.password),
+        role=body.role,
+        status=body.status,
+        quota=body.quota,
         expires_at=expires_at,
     )
     db.session.add(user)
     db.session.commit()
+    _invalidate_user_count()
 
     logger.info(f"Admin created user: {username}")
     return jsonify({
@@ -131,7 +288,8 @@ def get_user(user_id):
     获取单个用户
     GET /api/admin/users/<user_id>
     """
-    user = User.query.get(user_id)
+    with db.session.no_autoflush:
+        user = db.session.get(User, user_id, bind_arguments=read_bind_arguments())
     if not user:
         return jsonify({'error': '用户不存在'}), 404
 
@@ -151,7 +309,7 @@ def update_user(user_id):
         "expires_at": "2025-12-31T00:00:00Z"  // optional
     }
     """
-    user = User.query.get(user_id)
+    user = db.session.get(User, user_id)
     if not user:
         return jsonify({'error': '用户不存在'}), 404
 
@@ -168,28 +326,15 @@ def update_user(user_id):
         if 'status' in data and data['status'] != user.status:
             return jsonify({'error': '不能禁用自己的账号'}), 400
 
-    # 更新字段
-    if 'role' in data:
-        if data['role'] not in ('admin', 'user'):
-            return jsonify({'error': '角色必须是 admin 或 user'}), 400
-        user.role = data['role']
-
-    if 'status' in data:
-        if data['status'] not in ('active', 'disabled'):
-            return jsonify({'error': '状态必须是 active 或 disabled'}), 400
-        user.status = data['status']
-
-    if 'quota' in data:
-        user.quota = data['quota']
-
-    if 'expires_at' in data:
-        if data['expires_at']:
-            try:
-                user.expires_at = datetime.fromisoformat(data['expires_at'].replace('Z', '+00:00'))
-            except ValueError:
-                return jsonify({'error': '到期时间格式错误'}), 400
-        else:
-            user.expires_at = None
+    # 先整体校验，避免部分字段已写入 session 后才报错
+    try:
+        body = _UserUpdate.model_validate(data)
+    except ValidationError as e:
+        return jsonify({'error': _validation_message(e)}), 400
+
+    # 更新字段（只更新请求中出现的字段）
+    for field in body.model_fields_set:
+        setattr(user, field, getattr(body, field))
 
     db.session.commit()
 
@@ -208,7 +353,8 @@ def reset_password(user_id):
     POST /api/admin/users/<user_id>/reset-password
     Body: { "new_password": "xxx" }
     """
-    user = User.query.get(user_id)
+    with db.session.no_autoflush:
+        user = db.session.get(User, user_id)
     if not user:
         return jsonify({'error': '用户不存在'}), 404
 
@@ -236,7 +382,7 @@ def delete_user(user_id):
     删除用户
     DELETE /api/admin/users/<user_id>
     """
-    user = User.query.get(user_id)
+    user = db.session.get(User, user_id)
     if not user:
         return jsonify({'error': '用户不存在'}), 404
 
@@ -247,6 +393,7 @@ def delete_user(user_id):
     username = user.username
     db.session.delete(user)
     db.session.commit()
+    _invalidate_user_count()
 
     logger.info(f"Admin deleted user: {username}")
     return jsonify({'message': '用户删除成功'})
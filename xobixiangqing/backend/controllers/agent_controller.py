@@ -11,25 +11,55 @@ Endpoint:
 
 from __future__ import annotations
 
+import atexit
 import logging
-from typing import Any, Dict, Optional
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
-import httpx
 from flask import Blueprint, request
 
 from services.legacy_b_client import legacy_b_base_url, legacy_b_headers_from_settings
 from utils import error_response, success_response
 
+if TYPE_CHECKING:
+    import httpx
+
+# httpx is imported inside the handlers: most workers never proxy a chat to legacy B,
+# so they skip the httpx/httpcore/h11/certifi import chain at blueprint registration.
+
 logger = logging.getLogger(__name__)
 
 agent_bp = Blueprint("agent", __name__, url_prefix="/api/agent")
 
+# Shared keep-alive client for legacy B (created on first chat, closed at exit) so
+# consecutive chat turns reuse the TCP/TLS connection instead of reconnecting.
+_client: Optional["httpx.Client"] = None
+_client_lock = threading.Lock()
+
+
+def _timeout(seconds: float) -> "httpx.Timeout":
+    import httpx
 
-def _timeout(seconds: float) -> httpx.Timeout:
     s = float(seconds)
     return httpx.Timeout(s, connect=min(5.0, s))
 
 
+def _get_client() -> "httpx.Client":
+    """Get or create the shared legacy B client"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                import httpx
+
+                _client = httpx.Client(
+                    timeout=_timeout(60.0),
+                    limits=httpx.Limits(max_keepalive_connections=16),
+                )
+                atexit.register(_client.close)
+    return _client
+
+
 @agent_bp.route("/chat", methods=["POST"])
 def agent_chat():
     """
@@ -41,6 +71,8 @@ def agent_chat():
       - history: array (optional)
       - context: object (optional)
     """
+    import httpx
+
     try:
         payload = request.get_json(silent=True) or {}
         if not isinstance(payload, dict):
@@ -68,10 +100,9 @@ def agent_chat():
         url = f"{base}/api/smart-chat/"
         headers = legacy_b_headers_from_settings()
 
-        with httpx.Client(timeout=_timeout(60.0)) as client:
-            res = client.post(url, headers=headers, json=b_payload)
-            res.raise_for_status()
-            data = res.json()
+        res = _get_client().post(url, headers=headers, json=b_payload)
+        res.raise_for_status()
+        data = res.json()
 
         if not isinstance(data, dict):
             return error_response("LEGACY_B_ERROR", "Invalid response from legacy B", 502)
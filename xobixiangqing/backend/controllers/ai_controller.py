@@ -17,41 +17,115 @@ Endpoints:
 
 from __future__ import annotations
 
-import base64
+import binascii
+import hashlib
 import logging
+import os
+import re
+import shutil
+import threading
+import time
 import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache, wraps
 from io import BytesIO
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-from flask import Blueprint, current_app, request
+from flask import Blueprint, current_app, g, request
 from PIL import Image  # type: ignore
 
 from models import Asset, Job, db
 from services.ai_service_manager import get_ai_service
 from utils import bad_request, error_response, success_response
 
+try:
+    import pybase64  # 可选：SIMD 加速的 base64 解码，API 与标准库一致
+except ImportError:
+    pybase64 = None
+
+# 大图 data URL 解码走 pybase64（AVX2/SSSE3）；未安装时直接用 binascii.a2b_base64：
+# 它就是 base64.b64decode 的底层实现（非严格模式同样丢弃非字母表字符），
+# 但可直接读取 ASCII str 的内部缓冲，省去 b64decode 里 str.encode() 的整份复制
+_b64decode = pybase64.b64decode if pybase64 is not None else binascii.a2b_base64
+
 logger = logging.getLogger(__name__)
 
+# 资源库图片 URL：/api/assets/<id>[/download][?...]，一次匹配同时完成前缀判断与 id 提取
+_ASSET_URL_RE = re.compile(r"/api/assets/([^/?#]*)")
+
 ai_bp = Blueprint("ai", __name__, url_prefix="/api/ai")
 
+
+@ai_bp.record_once
+def _init_canvas_image_pool(state) -> None:
+    # 进程级共享线程池（参考图解码、PNG 落盘），避免每个请求都创建/销毁线程
+    state.app.extensions.setdefault(
+        "canvas_image_pool",
+        ThreadPoolExecutor(
+            max_workers=max(1, int(state.app.config.get("CANVAS_GLOBAL_IMAGE_WORKERS", 16))),
+            thread_name_prefix="canvas-img",
+        ),
+    )
+
+
+def _submit_bounded(pool: ThreadPoolExecutor, slots: threading.BoundedSemaphore, fn, *args, **kwargs) -> Future:
+    """Submit to the shared pool, holding one of the caller's slots until the task finishes."""
+    slots.acquire()
+    try:
+        future = pool.submit(fn, *args, **kwargs)
+    except BaseException:
+        slots.release()
+        raise
+    future.add_done_callback(lambda _f: slots.release())
+    return future
+
+
 # Log registered routes for debugging
 logger.info("[ai_controller] Blueprint registered with routes: /chat, /generate-image, /remove-background, /expand-image, /mockup, /edit-image, /inpaint")
 
 
+@lru_cache(maxsize=4)
+def _resolve_upload_root(raw: str) -> Path:
+    return Path(raw).resolve()
+
+
+def _upload_root() -> Path:
+    """Resolved UPLOAD_FOLDER; resolve() walks the filesystem, so it is cached per configured value."""
+    return _resolve_upload_root(current_app.config["UPLOAD_FOLDER"])
+
+
 def _decode_base64_image(base64_str: str) -> Image.Image:
     """
     Decode base64 string to PIL Image.
     Accepts both raw base64 and data URL format (data:image/png;base64,...).
     """
-    s = (base64_str or "").strip()
-    if not s:
+    return Image.open(BytesIO(_decode_base64_bytes(base64_str)))
+
+
+def _decode_base64_bytes(base64_str: str) -> bytes:
+    """Encoded image bytes behind a raw base64 / data URL string (see _decode_base64_image)."""
+    s = base64_str or ""
+    if not s or s.isspace():
         raise ValueError("Empty base64 image")
-    if "," in s:
-        s = s.split(",", 1)[1]
-    image_data = base64.b64decode(s)
-    return Image.open(BytesIO(image_data))
+    # data URL 头很短，只在开头找逗号；纯 base64 输入不做任何复制直接解码，
+    # 带头的只切一次 payload（解码时会丢弃首尾空白等非字母表字符，无需 strip）
+    comma = s.find("," if isinstance(s, str) else b",", 0, 256)
+    payload = s[comma + 1:] if comma >= 0 else s
+    return _b64decode(payload)
+
+
+# 前端主图工厂模板使用的段落标记；命中任一即视为"专业格式" prompt
+_STRUCTURED_PROMPT_TAGS = ("【产品】", "【统一风格】")
+
+
+def _is_structured_prompt(prompt: str) -> bool:
+    # 没有全角左括号就不可能命中任何标记，绝大多数自由输入走这条快路径
+    if "【" not in prompt:
+        return False
+    return any(tag in prompt for tag in _STRUCTURED_PROMPT_TAGS)
 
 
 @ai_bp.route("/chat", methods=["POST"], strict_slashes=False)
@@ -227,36 +301,34 @@ def generate_image():
 
         # 构建主图工厂的增强提示词（前端已经有详细的风格模板，这里只做简单包装）
         # 如果用户的 prompt 已经是专业格式（包含【产品】【统一风格】等），直接使用
-        if '【产品】' in prompt or '【统一风格】' in prompt:
+        is_structured_prompt = _is_structured_prompt(prompt)
+        if is_structured_prompt:
             enhanced_prompt = prompt
         else:
             enhanced_prompt = f"生成一张电商产品主图。{prompt}"
 
+        pool: ThreadPoolExecutor = current_app.extensions["canvas_image_pool"]
         ref_images: List[Image.Image] = []
-        logger.info("Reference images received: %s (type: %s)", reference_images, type(reference_images))
+        logger.info("Reference images received: %s", len(reference_images))
         if reference_images:
             # 有参考图时，如果用户 prompt 不是专业格式，添加参考图说明
-            if '【产品】' not in prompt and '【统一风格】' not in prompt:
+            if not is_structured_prompt:
                 enhanced_prompt = f"基于提供的参考图片，生成一张电商产品主图。{prompt}"
             # 否则保持 enhanced_prompt 不变（已经在上面设置了）
-            for idx, ref_data in enumerate(reference_images[:6]):
-                try:
-                    ref_str = str(ref_data).strip()
-                    logger.info("Processing reference image %s: %s (first 100 chars)", idx + 1, ref_str[:100] if len(ref_str) > 100 else ref_str)
-                    if not ref_str:
-                        logger.warning("Reference image %s is empty, skipping", idx + 1)
-                        continue
-                    # 支持 URL 格式（如 /api/assets/xxx/download）和 base64 格式
-                    img = _load_image_from_source(ref_str)
-                    img.load()
-                    ref_images.append(img)
-                    logger.info("Successfully loaded reference image %s, size: %s", idx + 1, img.size)
-                except Exception as load_error:
-                    logger.warning("Failed to load reference image %s: %s", idx + 1, load_error, exc_info=True)
+            ref_strs = [str(ref_data).strip() for ref_data in reference_images[:6]]
+            if len(ref_strs) > 1:
+                # base64 解码 + 像素解码在 PIL 的 C 代码里会释放 GIL，多张参考图并行加载
+                app = current_app._get_current_object()
+                loaded = list(pool.map(_load_reference_image, [app] * len(ref_strs), range(len(ref_strs)), ref_strs))
+            else:
+                loaded = [_load_reference_image(None, idx, ref_str) for idx, ref_str in enumerate(ref_strs)]
+            ref_images = [img for img in loaded if img is not None]
         logger.info("Total reference images loaded: %s", len(ref_images))
 
         # Create a lightweight Job record so the portal can track "单图生成" in Jobs center.
-        job = Job(system="A", job_type="SINGLE_GENERATE", status="running", project_id=project_id)
+        # id 预先生成：commit 后不再读取已过期的 job 属性，生成期间会话不会重新占用数据库连接
+        job_id = str(uuid.uuid4())
+        job = Job(id=job_id, system="A", job_type="SINGLE_GENERATE", status="running", project_id=project_id)
         job.started_at = datetime.utcnow()
         job.set_progress({"total": count, "completed": 0, "failed": 0})
         job.set_meta(
@@ -270,99 +342,195 @@ def generate_image():
         )
         db.session.add(job)
         db.session.commit()
-        job_id = job.id
 
-        upload_root = Path(current_app.config["UPLOAD_FOLDER"]).resolve()
+        upload_root = _upload_root()
+        png_options = _png_save_options()
 
         results: List[Dict[str, Any]] = []
+        # Asset 行先攒在内存里，循环结束后与 Job 状态一起提交（一次事务）
+        pending_assets: List[Asset] = []
+        # PNG 编码/落盘交给共享线程池，与其余生成请求重叠；
+        # 每个请求最多 2 张在途，避免攒下过多未落盘的大图
+        saves: List[tuple] = []
+        save_slots = threading.BoundedSemaphore(2)
         completed = 0
         failed = 0
+        # 各张图的生成请求互不依赖且以网络等待为主，在共享线程池里并发发出；
+        # 并发上限取 CANVAS_IMAGE_MAX_CONCURRENCY（0=自动），避免触发上游限流
+        concurrency = int(current_app.config.get("CANVAS_IMAGE_MAX_CONCURRENCY") or 0)
+        if concurrency <= 0:
+            concurrency = min(count, 4)
+        generate_slots = threading.BoundedSemaphore(concurrency)
+        # 循环内用到的属性链提前绑定为局部变量
+        generate = ai_service.image_provider.generate_image
+        ref_arg = ref_images or None
+        # 可选的生成结果缓存（CANVAS_IMAGE_CACHE_TTL>0 时启用）：key 含序号，同一批次仍是 N 张不同的图
+        cache_ttl = float(current_app.config.get("CANVAS_IMAGE_CACHE_TTL") or 0)
+        cache_base = (
+            _image_cache_base(provider=ai_service.image_provider, aspect_ratio=aspect_ratio, ref_images=ref_images)
+            if cache_ttl > 0 else None
+        )
+        cache_keys: List[Optional[str]] = [None] * count
+        cached_hits: Dict[int, Dict[str, Any]] = {}
+        generations: List[Optional[Future]] = []
+        prompts: List[str] = []
         for i in range(count):
+            # 为每张图构建不同的 prompt（如果有变化要求）
+            current_prompt = enhanced_prompt
+            if variations and i < len(variations):
+                variation = str(variations[i]).strip()
+                if variation:
+                    # 把变化要求放在提示词开头，让 AI 更重视
+                    current_prompt = f"{variation}\n\n{enhanced_prompt}"
+                    logger.info("Image %d/%d using variation: %s", i + 1, count, variation[:80])
+            else:
+                logger.info("Image %d/%d no variation specified", i + 1, count)
+            prompts.append(current_prompt)
+
+        # 多张图 prompt 完全相同时，先尝试 provider 的批量接口（一次请求出 N 张）；
+        # 不支持或返回不足的部分仍按单张并发生成
+        batch_images: List[Image.Image] = []
+        generate_batch = getattr(ai_service.image_provider, "generate_images", None)
+        if generate_batch is not None and count > 1 and cache_base is None and len(set(prompts)) == 1:
             try:
-                # 为每张图构建不同的 prompt（如果有变化要求）
-                current_prompt = enhanced_prompt
-                if variations and i < len(variations):
-                    variation = str(variations[i]).strip()
-                    if variation:
-                        # 把变化要求放在提示词开头，让 AI 更重视
-                        current_prompt = f"{variation}\n\n{enhanced_prompt}"
-                        logger.info("Image %d/%d using variation: %s", i + 1, count, variation[:80])
-                else:
-                    logger.info("Image %d/%d no variation specified", i + 1, count)
+                batch_images = list(
+                    generate_batch(prompts[0], count, ref_images=ref_arg, aspect_ratio=aspect_ratio, resolution="1K") or []
+                )[:count]
+            except Exception as batch_error:
+                logger.warning("Batch image generation failed, falling back to per-image calls: %s", batch_error, exc_info=True)
+            if batch_images:
+                logger.info("Batch generation returned %d/%d images", len(batch_images), count)
+
+        for i, current_prompt in enumerate(prompts):
+            if i < len(batch_images):
+                batched: Future = Future()
+                batched.set_result(batch_images[i])
+                generations.append(batched)
+                continue
 
-                generated = ai_service.image_provider.generate_image(
-                    prompt=current_prompt,
-                    ref_images=ref_images if ref_images else None,
-                    aspect_ratio=aspect_ratio,
-                    resolution="1K",
+            if cache_base is not None:
+                cache_keys[i] = _image_cache_key(cache_base, current_prompt, i)
+                hit = _image_cache_get(cache_keys[i])
+                if hit is not None:
+                    logger.info("Image %d/%d served from cache", i + 1, count)
+                    cached_hits[i] = hit
+                    generations.append(None)
+                    continue
+
+            try:
+                generations.append(
+                    _submit_bounded(
+                        pool,
+                        generate_slots,
+                        generate,
+                        prompt=current_prompt,
+                        ref_images=ref_arg,
+                        aspect_ratio=aspect_ratio,
+                        resolution="1K",
+                    )
                 )
+            except Exception as submit_error:
+                logger.error("Canvas image generation error (%s/%s): %s", i + 1, count, submit_error, exc_info=True)
+                generations.append(None)
+
+        # 缓存命中与新生成的图片走同一条落库路径：(index, asset, (width, height), future -> size_bytes)
+        assets_root = upload_root / "assets"
+        new_id = uuid.uuid4
+        asset_fields = {
+            "system": "A",
+            "kind": "image",
+            "storage": "local",
+            "content_type": "image/png",
+            "job_id": job_id,
+            "project_id": project_id,
+        }
+        asset_meta = {
+            "source": "canvas_generate_image",
+            "aspect_ratio": aspect_ratio,
+            "prompt": prompt,
+            "enhanced_prompt": enhanced_prompt,
+            "reference_images": len(ref_images),
+        }
+        for i, generation in enumerate(generations):
+            try:
+                hit = cached_hits.get(i)
+                if hit is not None:
+                    # 命中缓存：不再调用模型、也不重新编码；已有文件硬链接（不支持时复制）到新 Asset 自己的目录，
+                    # 两条记录各有独立文件，删除任一条都不影响另一条
+                    filename = f"canvas_{new_id().hex}.png"
+                    asset = Asset(id=str(new_id()), name=filename, **asset_fields)
+                    asset.set_meta({**asset_meta, "cache_hit": True})
+                    file_path = assets_root / asset.id / filename
+                    asset.file_path = f"assets/{asset.id}/{filename}"
+                    future = _submit_bounded(pool, save_slots, _link_or_copy_file, upload_root / hit["file_path"], file_path)
+                    saves.append((i, asset, (hit["width"], hit["height"]), future))
+                    continue
+                if generation is None:
+                    failed += 1
+                    continue
+                generated = generation.result()
                 if generated is None:
                     failed += 1
                     continue
 
-                filename = f"canvas_{uuid.uuid4().hex}.png"
-                asset = Asset(system="A", kind="image", name=filename, storage="local", job_id=job_id, project_id=project_id)
-                asset.set_meta(
-                    {
-                        "source": "canvas_generate_image",
-                        "aspect_ratio": aspect_ratio,
-                        "prompt": prompt,
-                        "enhanced_prompt": enhanced_prompt,
-                        "reference_images": len(ref_images),
-                    }
-                )
-                db.session.add(asset)
-                db.session.flush()
-
-                asset_dir = (upload_root / "assets" / asset.id).resolve()
-                asset_dir.mkdir(parents=True, exist_ok=True)
-
-                file_path = (asset_dir / filename).resolve()
-                generated.save(str(file_path), format="PNG")
+                filename = f"canvas_{new_id().hex}.png"
+                # 预先分配主键，无需逐张 flush 就能得到目录名；路径直接拼接，不再逐张 resolve()/relative_to
+                asset = Asset(id=str(new_id()), name=filename, **asset_fields)
+                asset.set_meta(asset_meta)
+                file_path = assets_root / asset.id / filename
+                asset.file_path = f"assets/{asset.id}/{filename}"
+                future = _submit_bounded(pool, save_slots, _write_png, generated, file_path, png_options)
+                saves.append((i, asset, generated.size, future))
+            except Exception as img_error:
+                logger.error("Canvas image generation error (%s/%s): %s", i + 1, count, img_error, exc_info=True)
+                failed += 1
+                continue
 
-                asset.file_path = file_path.relative_to(upload_root).as_posix()
-                asset.content_type = "image/png"
-                try:
-                    asset.size_bytes = int(file_path.stat().st_size)
-                except Exception:
-                    asset.size_bytes = None
+        # 按提交顺序收集，保持结果顺序与 variations 一致
+        for i, asset, (width, height), future in saves:
+            try:
+                size_bytes = future.result()
+            except Exception as save_error:
+                logger.error("Canvas image save error (%s/%s): %s", i + 1, count, save_error, exc_info=True)
+                failed += 1
+                continue
 
-                width, height = generated.size
-                results.append(
+            asset.size_bytes = size_bytes
+            if cache_keys[i] is not None and i not in cached_hits:
+                _image_cache_put(
+                    cache_keys[i],
                     {
-                        "asset_id": asset.id,
-                        "image_url": f"/api/assets/{asset.id}/download",
+                        "name": asset.name,
+                        "file_path": asset.file_path,
+                        "size_bytes": size_bytes,
                         "width": width,
                         "height": height,
-                    }
+                    },
+                    cache_ttl,
                 )
-                completed += 1
-            except Exception as img_error:
-                logger.error("Canvas image generation error (%s/%s): %s", i + 1, count, img_error, exc_info=True)
-                failed += 1
-                continue
+            pending_assets.append(asset)
+            results.append(_asset_result(asset, width, height))
+            completed += 1
 
         if not results:
-            db.session.rollback()
+            # Asset 只在成功时才加入 session，这里没有需要回滚的写入；
+            # 不 rollback 也就不会让 job 过期，直接改写即可，无需再 SELECT 一次
             if job_id:
                 try:
-                    j = Job.query.get(job_id)
-                    if j:
-                        j.status = "failed"
-                        j.error_message = "图片生成失败，请重试"
-                        j.completed_at = datetime.utcnow()
-                        j.set_progress({"total": count, "completed": 0, "failed": count})
-                        db.session.commit()
+                    job.status = "failed"
+                    job.error_message = "图片生成失败，请重试"
+                    job.completed_at = datetime.utcnow()
+                    job.set_progress({"total": count, "completed": 0, "failed": count})
+                    db.session.commit()
                 except Exception:
                     db.session.rollback()
             return error_response("IMAGE_GENERATION_FAILED", "图片生成失败，请重试", 500)
 
+        db.session.add_all(pending_assets)
         try:
-            j = Job.query.get(job_id) if job_id else None
-            if j:
-                j.status = "succeeded"
-                j.completed_at = datetime.utcnow()
-                j.set_progress({"total": count, "completed": completed, "failed": failed})
+            job.status = "succeeded"
+            job.completed_at = datetime.utcnow()
+            job.set_progress({"total": count, "completed": completed, "failed": failed})
         except Exception:
             logger.warning("Failed to update SINGLE_GENERATE job status", exc_info=True)
 
@@ -381,7 +549,7 @@ def generate_image():
         db.session.rollback()
         if job_id:
             try:
-                j = Job.query.get(job_id)
+                j = job if job in db.session else db.session.get(Job, job_id)
                 if j:
                     j.status = "failed"
                     j.error_message = f"图片生成失败: {str(e)}"
@@ -393,6 +561,177 @@ def generate_image():
         return error_response("IMAGE_GENERATION_ERROR", f"图片生成失败: {str(e)}", 500)
 
 
+def _load_reference_image(app, idx: int, ref_str: str) -> Optional[Image.Image]:
+    """
+    Load and fully decode one reference image; returns None (and logs) on failure.
+    Pass the Flask app when running off the request thread (asset URLs need the DB).
+    """
+    if not ref_str:
+        logger.warning("Reference image %s is empty, skipping", idx + 1)
+        return None
+    if app is not None:
+        with app.app_context():
+            return _load_reference_image(None, idx, ref_str)
+    logger.info("Processing reference image %s: %s (first 100 chars)", idx + 1, ref_str[:100])
+    try:
+        # 支持 URL 格式（如 /api/assets/xxx/download）和 base64 格式
+        asset_match = _ASSET_URL_RE.match(ref_str)
+        if asset_match:
+            # 资源库图片每次都先查 Asset 行（与未命中缓存时同一套校验），已删除的资源不会从缓存里复用；
+            # key 含文件路径与 mtime，文件被替换后旧的解码结果自然失效
+            file_path = _asset_file_path(asset_match.group(1))
+            cache_key = f"asset:{asset_match.group(1)}:{file_path}:{file_path.stat().st_mtime_ns}"
+        else:
+            file_path = None
+            cache_key = _ref_cache_key(ref_str)
+        data = _ref_cache_get(cache_key)
+        cached = data is not None
+        if not cached:
+            data = file_path.read_bytes() if file_path is not None else _decode_base64_bytes(ref_str)
+        # 每个调用方各自解码一个新 Image：provider 会对参考图 save()/convert()，PIL 对象不能跨线程共享
+        img = Image.open(BytesIO(data))
+        img.load()
+    except Exception as load_error:
+        logger.warning("Failed to load reference image %s: %s", idx + 1, load_error, exc_info=True)
+        return None
+    logger.info("Successfully loaded reference image %s%s, size: %s", idx + 1, " (cached bytes)" if cached else "", img.size)
+    if not cached:
+        _ref_cache_put(cache_key, data)
+    return img
+
+
+# 参考图缓存：同一张参考图（同一资源库文件或相同 base64 内容）在多次生成间复用编码后的原始字节，
+# 省掉读盘/base64 解码；不缓存 Image 对象（非线程安全）。按字节数设上限，LRU 淘汰
+_REF_CACHE_MAX_BYTES = 128 * 1024 * 1024
+_ref_cache: "OrderedDict[str, tuple[bytes, int]]" = OrderedDict()
+_ref_cache_bytes = 0
+_ref_cache_lock = threading.Lock()
+
+
+def _ref_cache_key(ref_str: str) -> str:
+    # base64 参考图按内容哈希（资源库图片的 key 由 _load_reference_image 按 id/路径/mtime 生成）
+    return "b64:" + hashlib.blake2b(ref_str.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+
+
+def _ref_cache_get(key: str) -> Optional[bytes]:
+    with _ref_cache_lock:
+        item = _ref_cache.get(key)
+        if item is None:
+            return None
+        _ref_cache.move_to_end(key)
+        return item[0]
+
+
+def _ref_cache_put(key: str, data: bytes) -> None:
+    global _ref_cache_bytes
+    nbytes = len(data)
+    if nbytes > _REF_CACHE_MAX_BYTES // 4:
+        return
+    with _ref_cache_lock:
+        old = _ref_cache.pop(key, None)
+        if old is not None:
+            _ref_cache_bytes -= old[1]
+        _ref_cache[key] = (data, nbytes)
+        _ref_cache_bytes += nbytes
+        while _ref_cache_bytes > _REF_CACHE_MAX_BYTES:
+            _, (_, evicted) = _ref_cache.popitem(last=False)
+            _ref_cache_bytes -= evicted
+
+
+# 画布生图结果缓存：key -> (expires_at, entry)，进程内、按插入顺序淘汰
+_IMAGE_CACHE_MAX_ENTRIES = 512
+_image_cache: Dict[str, tuple] = {}
+_image_cache_lock = threading.Lock()
+
+
+def _image_cache_base(*, provider: Any, aspect_ratio: str, ref_images: List[Image.Image]) -> str:
+    """Hash of the per-request inputs (provider/model, aspect ratio, reference pixels) of a canvas generation."""
+    h = hashlib.sha256()
+    h.update(f"{type(provider).__name__}|{getattr(provider, 'model', '')}|{aspect_ratio}|1K".encode("utf-8"))
+    for img in ref_images:
+        h.update(f"|{img.mode}{img.size}".encode("ascii"))
+        h.update(hashlib.blake2b(img.tobytes(), digest_size=16).digest())
+    return h.hexdigest()
+
+
+def _image_cache_key(base: str, prompt: str, index: int) -> str:
+    return hashlib.sha256(f"{base}|{index}|{prompt}".encode("utf-8")).hexdigest()
+
+
+def _image_cache_get(key: str) -> Optional[Dict[str, Any]]:
+    with _image_cache_lock:
+        item = _image_cache.get(key)
+        if item is None:
+            return None
+        expires_at, entry = item
+        if expires_at <= time.monotonic():
+            del _image_cache[key]
+            return None
+    # 文件被手动清理过就当未命中
+    upload_root = current_app.config["UPLOAD_FOLDER"]
+    if not os.path.isfile(os.path.join(upload_root, entry["file_path"])):
+        return None
+    return entry
+
+
+def _image_cache_put(key: str, entry: Dict[str, Any], ttl: float) -> None:
+    with _image_cache_lock:
+        _image_cache.pop(key, None)
+        _image_cache[key] = (time.monotonic() + ttl, entry)
+        while len(_image_cache) > _IMAGE_CACHE_MAX_ENTRIES:
+            del _image_cache[next(iter(_image_cache))]
+
+
+def _png_save_options() -> Dict[str, Any]:
+    """PNG encoder options for AI results (zlib level 1 unless CANVAS_FAST_PNG is off)."""
+    return {"compress_level": 1} if current_app.config.get("CANVAS_FAST_PNG", True) else {}
+
+
+def _save_png_atomic(image: Image.Image, file_path: Path, options: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Write a PNG via a temp file + os.replace so concurrent downloads never see a partial file.
+    Encodes in memory first and returns the byte size, so callers need no stat().
+    """
+    buf = BytesIO()
+    image.save(buf, format="PNG", **(options or {}))
+    tmp_path = file_path.with_name(f"{file_path.name}.tmp")
+    try:
+        with buf.getbuffer() as data:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            size_bytes = len(data)
+        os.replace(tmp_path, file_path)
+        return size_bytes
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
+
+
+def _write_png(image: Image.Image, file_path: Path, options: Dict[str, Any]) -> int:
+    """Encode ``image`` to ``file_path`` (creating its directory); returns the file size in bytes."""
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    return _save_png_atomic(image, file_path, options)
+
+
+def _link_or_copy_file(src: Path, dst: Path) -> int:
+    """Give ``dst`` its own copy of ``src`` (hard link when possible); returns the file size in bytes."""
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        # 跨设备或文件系统不支持硬链接时退回普通复制
+        shutil.copyfile(src, dst)
+    return dst.stat().st_size
+
+
+def _asset_result(asset: Asset, width: int, height: int) -> Dict[str, Any]:
+    """Response row for a generated image asset."""
+    return {"asset_id": asset.id, "image_url": f"/api/assets/{asset.id}/download", "width": width, "height": height}
+
+
 def _save_image_as_asset(
     image: Image.Image,
     job_id: Optional[str],
@@ -400,58 +739,92 @@ def _save_image_as_asset(
     meta: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """Save PIL Image as Asset and return asset info."""
-    upload_root = Path(current_app.config["UPLOAD_FOLDER"]).resolve()
+    upload_root = _upload_root()
     filename = f"{source}_{uuid.uuid4().hex}.png"
-    asset = Asset(system="A", kind="image", name=filename, storage="local", job_id=job_id)
+    # id 在 Python 侧生成（与列默认值同格式），无需 flush 往返即可确定落盘目录；INSERT 随调用方 commit 一并发出
+    asset = Asset(id=str(uuid.uuid4()), system="A", kind="image", name=filename, storage="local", job_id=job_id)
     asset.set_meta(meta or {"source": source})
     db.session.add(asset)
-    db.session.flush()
-    asset_dir = (upload_root / "assets" / asset.id).resolve()
+    # 路径全部由已解析的 upload_root 与本地生成的 id/文件名拼出，无需再 resolve()/relative_to
+    asset_dir = upload_root / "assets" / asset.id
     asset_dir.mkdir(parents=True, exist_ok=True)
-    file_path = (asset_dir / filename).resolve()
-    image.save(str(file_path), format="PNG")
-    asset.file_path = file_path.relative_to(upload_root).as_posix()
+    file_path = asset_dir / filename
+    asset.size_bytes = _save_png_atomic(image, file_path, _png_save_options())
+    asset.file_path = f"assets/{asset.id}/{filename}"
     asset.content_type = "image/png"
-    try:
-        asset.size_bytes = int(file_path.stat().st_size)
-    except Exception:
-        asset.size_bytes = None
     width, height = image.size
-    return {"asset_id": asset.id, "image_url": f"/api/assets/{asset.id}/download", "width": width, "height": height}
+    return _asset_result(asset, width, height)
+
+
+def _release_db_connection() -> None:
+    """
+    End the request's read transaction before a long upstream AI call.
+    The pooled connection goes back to the pool instead of being held for the whole wait.
+    """
+    db.session.close()
+
+
+def _asset_file_path(asset_id: str) -> Path:
+    """Look up an Asset row and return its file on disk; raises ValueError when it is gone."""
+    logger.info("Loading from asset: %s", asset_id)
+    asset = Asset.query.get(asset_id)
+    if not asset or not asset.file_path:
+        logger.error("Asset not found or no file_path: asset=%s", asset)
+        raise ValueError("Asset not found")
+    return _upload_root() / asset.file_path
 
 
 def _load_image_from_source(image_data: str) -> Image.Image:
     """Load image from base64 or asset URL."""
     logger.info("_load_image_from_source called with: %s (first 80 chars)", image_data[:80] if len(image_data) > 80 else image_data)
-    if image_data.startswith("/api/assets/"):
-        asset_id = image_data.split("/")[3]
-        logger.info("Loading from asset: %s", asset_id)
-        asset = Asset.query.get(asset_id)
-        if not asset or not asset.file_path:
-            logger.error("Asset not found or no file_path: asset=%s", asset)
-            raise ValueError("Asset not found")
-        upload_root = Path(current_app.config["UPLOAD_FOLDER"]).resolve()
-        file_path = upload_root / asset.file_path
+    asset_match = _ASSET_URL_RE.match(image_data)
+    if asset_match:
+        file_path = _asset_file_path(asset_match.group(1))
         logger.info("Loading image from file: %s", file_path)
         return Image.open(str(file_path))
     logger.info("Falling back to base64 decode")
     return _decode_base64_image(image_data)
 
 
+def _require_source_image(f):
+    """Decorator for single-image AI endpoints: parse the JSON body once and require a non-empty "image"."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, dict):
+            payload = {}
+        image_data = str(payload.get("image") or "").strip()
+        if not image_data:
+            return bad_request("Image is required")
+
+        # 将解析结果存储到 g 对象，原图在处理函数里首次用到时才解码
+        g.ai_payload = payload
+        g.ai_image_data = image_data
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+def _source_image() -> Image.Image:
+    """Load and fully decode the request's source image on first use; later calls reuse it."""
+    image = g.get("ai_source_image")
+    if image is None:
+        image = _load_image_from_source(g.ai_image_data)
+        image.load()
+        g.ai_source_image = image
+    return image
+
+
 @ai_bp.route("/remove-background", methods=["POST"], strict_slashes=False)
+@_require_source_image
 def remove_background():
     """POST /api/ai/remove-background - 移除背景"""
     try:
-        payload = request.get_json(silent=True) or {}
-        image_data = str(payload.get("image") or "").strip()
-        if not image_data:
-            return bad_request("Image is required")
-        source_image = _load_image_from_source(image_data)
-        source_image.load()
+        source_image = _source_image()
         ai_service = get_ai_service()
         if not getattr(ai_service, "image_provider", None):
             return error_response("IMAGE_PROVIDER_NOT_CONFIGURED", "图片处理服务未配置", 500)
         prompt = "Remove the background completely. Keep only the main subject with transparent background. Output a clean cutout."
+        _release_db_connection()
         result = ai_service.image_provider.generate_image(prompt=prompt, ref_images=[source_image], aspect_ratio="1:1", resolution="1K")
         if result is None:
             return error_response("REMOVE_BG_FAILED", "移除背景失败", 500)
@@ -465,23 +838,21 @@ def remove_background():
 
 
 @ai_bp.route("/expand-image", methods=["POST"], strict_slashes=False)
+@_require_source_image
 def expand_image():
     """POST /api/ai/expand-image - 图片扩展/Outpainting"""
     try:
-        payload = request.get_json(silent=True) or {}
-        image_data = str(payload.get("image") or "").strip()
-        if not image_data:
-            return bad_request("Image is required")
+        payload = g.ai_payload
         direction = str(payload.get("direction") or "all").strip()
         user_prompt = str(payload.get("prompt") or "").strip()
-        source_image = _load_image_from_source(image_data)
-        source_image.load()
+        source_image = _source_image()
         ai_service = get_ai_service()
         if not getattr(ai_service, "image_provider", None):
             return error_response("IMAGE_PROVIDER_NOT_CONFIGURED", "图片处理服务未配置", 500)
         prompt = f"Expand this image outward ({direction}). Seamlessly extend the scene maintaining consistent style and lighting."
         if user_prompt:
             prompt += f" Context: {user_prompt}"
+        _release_db_connection()
         result = ai_service.image_provider.generate_image(prompt=prompt, ref_images=[source_image], aspect_ratio="1:1", resolution="1K")
         if result is None:
             return error_response("EXPAND_FAILED", "图片扩展失败", 500)
@@ -495,17 +866,14 @@ def expand_image():
 
 
 @ai_bp.route("/mockup", methods=["POST"], strict_slashes=False)
+@_require_source_image
 def mockup():
     """POST /api/ai/mockup - Mockup场景合成"""
     try:
-        payload = request.get_json(silent=True) or {}
-        image_data = str(payload.get("image") or "").strip()
-        if not image_data:
-            return bad_request("Image is required")
+        payload = g.ai_payload
         scene = str(payload.get("scene") or "").strip()
         style = str(payload.get("style") or "professional").strip()
-        source_image = _load_image_from_source(image_data)
-        source_image.load()
+        source_image = _source_image()
         ai_service = get_ai_service()
         if not getattr(ai_service, "image_provider", None):
             return error_response("IMAGE_PROVIDER_NOT_CONFIGURED", "图片处理服务未配置", 500)
@@ -514,6 +882,7 @@ def mockup():
         prompt = f"Create a professional e-commerce product mockup. Style: {style_desc}."
         if scene:
             prompt = f"Place this product in: {scene}. {prompt}"
+        _release_db_connection()
         result = ai_service.image_provider.generate_image(prompt=prompt, ref_images=[source_image], aspect_ratio="1:1", resolution="1K")
         if result is None:
             return error_response("MOCKUP_FAILED", "Mockup生成失败", 500)
@@ -527,22 +896,19 @@ def mockup():
 
 
 @ai_bp.route("/edit-image", methods=["POST"], strict_slashes=False)
+@_require_source_image
 def edit_image():
     """POST /api/ai/edit-image - AI局部编辑"""
     try:
-        payload = request.get_json(silent=True) or {}
-        image_data = str(payload.get("image") or "").strip()
-        edit_prompt = str(payload.get("prompt") or "").strip()
-        if not image_data:
-            return bad_request("Image is required")
+        edit_prompt = str(g.ai_payload.get("prompt") or "").strip()
         if not edit_prompt:
             return bad_request("Edit prompt is required")
-        source_image = _load_image_from_source(image_data)
-        source_image.load()
+        source_image = _source_image()
         ai_service = get_ai_service()
         if not getattr(ai_service, "image_provider", None):
             return error_response("IMAGE_PROVIDER_NOT_CONFIGURED", "图片处理服务未配置", 500)
         prompt = f"Edit this image: {edit_prompt}. Maintain the overall quality and style."
+        _release_db_connection()
         result = ai_service.image_provider.generate_image(prompt=prompt, ref_images=[source_image], aspect_ratio="1:1", resolution="1K")
         if result is None:
             return error_response("EDIT_FAILED", "图片编辑失败", 500)
@@ -556,6 +922,7 @@ def edit_image():
 
 
 @ai_bp.route("/inpaint", methods=["POST"], strict_slashes=False)
+@_require_source_image
 def inpaint():
     """
     POST /api/ai/inpaint - 涂抹改图 (Inpainting)
@@ -572,14 +939,11 @@ def inpaint():
       - asset_id: string
     """
     try:
-        payload = request.get_json(silent=True) or {}
+        payload = g.ai_payload
 
-        image_data = str(payload.get("image") or "").strip()
         mask_data = str(payload.get("mask") or "").strip()
         prompt = str(payload.get("prompt") or "").strip()
 
-        if not image_data:
-            return bad_request("Image is required")
         if not mask_data:
             return bad_request("Mask is required")
         if not prompt:
@@ -588,8 +952,7 @@ def inpaint():
         logger.info("Inpaint request: prompt=%s", prompt[:100] if len(prompt) > 100 else prompt)
 
         # Load source image
-        source_image = _load_image_from_source(image_data)
-        source_image.load()
+        source_image = _source_image()
 
         # Load mask image (always base64 from canvas)
         mask_image = _decode_base64_image(mask_data)
@@ -602,6 +965,7 @@ def inpaint():
             return error_response("IMAGE_PROVIDER_NOT_CONFIGURED", "图片处理服务未配置，请检查 API 设置", 500)
 
         # Call inpaint method
+        _release_db_connection()
         result = ai_service.image_provider.inpaint(
             image=source_image,
             mask=mask_image,
@@ -627,6 +627,8 @@ def test_image_model():
 
 def _sync_settings_to_config(settings: Settings):
     """Sync settings to Flask app config and clear AI service cache if needed"""
+    Settings.clear_cache()
+
     # Track if AI-related settings changed
     ai_config_changed = False
     
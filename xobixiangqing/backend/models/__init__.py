@@ -13,6 +13,17 @@ db = SQLAlchemy(
     }
 )
 
+
+
+def read_bind_arguments():
+    """
+    Session bind arguments that route a read-only query to the SQLite
+    `readonly` bind; None (default engine) when that bind is not configured.
+    """
+    engine = db.engines.get('readonly')
+    return {'bind': engine} if engine is not None else None
+
+
 from .project import Project
 from .page import Page
 from .task import Task
@@ -31,6 +42,7 @@ from .user import User
 
 __all__ = [
     'db',
+    'read_bind_arguments',
     'Project',
     'Page',
     'Task',
@@ -15,6 +15,28 @@ from typing import Any, Dict, Optional
 
 from . import db
 
+try:
+    import orjson
+except ImportError:  # 可选依赖，未安装时用标准库
+    orjson = None
+
+# 与 json.dumps(ensure_ascii=False, separators=(",", ":")) 输出一致：紧凑、非 ASCII 原样保留；
+# datetime 不做隐式转换（标准库同样会报错）
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME if orjson is not None else 0
+
+
+def _dumps(data: Dict[str, Any]) -> str:
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=_ORJSON_OPTIONS).decode("utf-8")
+        except TypeError:
+            pass  # 例如超出 64 位的整数，交给标准库
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+def _loads(raw: str) -> Any:
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
 
 class Job(db.Model):
     __tablename__ = "jobs"
@@ -54,25 +76,25 @@ class Job(db.Model):
         if not self.progress:
             return {}
         try:
-            v = json.loads(self.progress)
+            v = _loads(self.progress)
             return v if isinstance(v, dict) else {}
         except Exception:
             return {}
 
     def set_progress(self, data: Optional[Dict[str, Any]]) -> None:
-        self.progress = json.dumps(data or {}, ensure_ascii=False, separators=(",", ":"))
+        self.progress = _dumps(data or {})
 
     def get_meta(self) -> Dict[str, Any]:
         if not self.meta:
             return {}
         try:
-            v = json.loads(self.meta)
+            v = _loads(self.meta)
             return v if isinstance(v, dict) else {}
         except Exception:
             return {}
 
     def set_meta(self, data: Optional[Dict[str, Any]]) -> None:
-        self.meta = json.dumps(data or {}, ensure_ascii=False, separators=(",", ":"))
+        self.meta = _dumps(data or {})
 
     def to_dict(self) -> Dict[str, Any]:
         return {
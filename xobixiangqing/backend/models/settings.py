@@ -1,7 +1,15 @@
 """Settings model"""
+import time
 from datetime import datetime, timezone
+from types import SimpleNamespace
 from . import db
 
+# Short-lived per-process cache of frequently polled settings values (key -> (expires_at, value)).
+# Cleared by Settings.clear_cache() on every settings write; the TTL bounds staleness
+# across worker processes.
+_SETTINGS_CACHE_TTL = 30.0
+_settings_cache = {}
+
 
 class Settings(db.Model):
     """
@@ -135,5 +143,26 @@ class Settings(db.Model):
                 db.session.commit()
         return settings
 
+    @staticmethod
+    def get_cached_settings():
+        """
+        Read-only snapshot (plain attributes, detached from the session) of the
+        settings row, served from the TTL cache when fresh. Use get_settings()
+        when the row is going to be modified.
+        """
+        cached = _settings_cache.get('settings')
+        now = time.monotonic()
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        settings = Settings.get_settings()
+        snapshot = SimpleNamespace(**{c.key: getattr(settings, c.key) for c in Settings.__table__.columns})
+        _settings_cache['settings'] = (now + _SETTINGS_CACHE_TTL, snapshot)
+        return snapshot
+
+    @staticmethod
+    def clear_cache():
+        """Drop cached settings values (call after writing settings)."""
+        _settings_cache.clear()
+
     def __repr__(self):
         return f'<Settings id={self.id}>'
@@ -35,6 +35,13 @@ pip install -r requirements.txt
 mkdir -p instance
 mkdir -p uploads
 
+# Run database migrations (columns of existing tables); app.py creates any missing tables
+echo "🗄️  Running database migrations..."
+export FLASK_APP=app.py
+if ! python -m flask db upgrade; then
+    echo "⚠️  Database migration had issues; app.py still creates missing tables on startup, but new columns need the migration."
+fi
+
 echo ""
 echo "✅ Setup complete!"
 echo ""
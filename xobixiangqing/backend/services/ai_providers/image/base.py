@@ -6,6 +6,16 @@ from typing import Optional, List
 from PIL import Image
 
 
+# Mask pixels with alpha > 50 mark the edit area
+_MASK_THRESHOLD_LUT = [255 if a > 50 else 0 for a in range(256)]
+# 50% blend with red per RGBA band: R -> (R + 255) / 2, G -> G / 2, B -> B / 2, A unchanged
+_RED_BLEND_LUT = (
+    [min(255, int(v * 0.5 + 255 * 0.5)) for v in range(256)]
+    + [int(v * 0.5) for v in range(256)] * 2
+    + list(range(256))
+)
+
+
 class ImageProvider(ABC):
     """Abstract base class for image generation"""
 
@@ -38,6 +48,33 @@ class ImageProvider(ABC):
         """
         pass
 
+    def generate_images(
+        self,
+        prompt: str,
+        count: int,
+        ref_images: Optional[List[Image.Image]] = None,
+        aspect_ratio: str = "16:9",
+        resolution: str = "2K",
+        *,
+        model: Optional[str] = None,
+    ) -> Optional[List[Image.Image]]:
+        """
+        Generate several images for the same prompt in one upstream request.
+
+        Args:
+            prompt: The image generation prompt
+            count: Number of images wanted
+            ref_images: Optional list of reference images (PIL Image objects)
+            aspect_ratio: Image aspect ratio
+            resolution: Image resolution
+            model: Optional model override for this request
+
+        Returns:
+            Generated images (may be fewer than count), or None when the provider/model
+            has no batch endpoint; callers then fall back to one generate_image call per image.
+        """
+        return None
+
     def inpaint(
         self,
         image: Image.Image,
@@ -95,34 +132,30 @@ class ImageProvider(ABC):
         Returns:
             Combined image with mask overlay
         """
-        # Ensure images are in RGBA mode
+        # Ensure image is in RGBA mode (always work on a new image; the caller's is left untouched)
         if image.mode != 'RGBA':
             image = image.convert('RGBA')
-        if mask.mode != 'RGBA':
-            mask = mask.convert('RGBA')
-
-        # Resize mask to match image size if needed
-        if mask.size != image.size:
-            mask = mask.resize(image.size, Image.Resampling.LANCZOS)
-
-        # Create a red overlay for the masked area
-        result = image.copy()
-        mask_data = mask.load()
-        result_data = result.load()
-
-        width, height = image.size
-        for y in range(height):
-            for x in range(width):
-                mask_pixel = mask_data[x, y]
-                # Check if the mask pixel is non-transparent (alpha > 0)
-                if len(mask_pixel) >= 4 and mask_pixel[3] > 50:
-                    # Blend with semi-transparent red to indicate edit area
-                    orig = result_data[x, y]
-                    result_data[x, y] = (
-                        min(255, int(orig[0] * 0.5 + 255 * 0.5)),  # R
-                        int(orig[1] * 0.5),  # G
-                        int(orig[2] * 0.5),  # B
-                        orig[3] if len(orig) >= 4 else 255  # A
-                    )
-
-        return result
+        else:
+            image = image.copy()
+
+        # Only the mask's alpha matters: take that single band first, so the
+        # resize and threshold below touch one band instead of four
+        if 'A' in mask.getbands():
+            mask_alpha = mask.getchannel('A')
+        else:
+            mask_alpha = mask.convert('RGBA').getchannel('A')
+        # Bilinear is enough for an alpha that is thresholded right after; Lanczos' wider
+        # kernel only sharpens edges the threshold throws away
+        if mask_alpha.size != image.size:
+            mask_alpha = mask_alpha.resize(image.size, Image.Resampling.BILINEAR)
+
+        # Blend the masked area with semi-transparent red to indicate the edit area.
+        # Both steps are table lookups in Pillow's C code instead of a per-pixel Python loop,
+        # and the blend only runs inside the mask's bounding box (brush strokes are usually small)
+        edit_area = mask_alpha.point(_MASK_THRESHOLD_LUT)
+        bbox = edit_area.getbbox()
+        if bbox is None:
+            return image
+        highlighted = image.crop(bbox).point(_RED_BLEND_LUT)
+        image.paste(highlighted, bbox[:2], edit_area.crop(bbox))
+        return image
@@ -259,15 +259,13 @@ class GenAIImageProvider(ImageProvider):
             mask = mask.convert('RGBA')
 
         # Resize mask to match image size if needed
+        # 遮罩只是给模型看的标记，双线性插值足够，开销明显低于 LANCZOS
         if mask.size != image.size:
-            mask = mask.resize(image.size, Image.Resampling.LANCZOS)
-
-        # 创建结果图片
-        result = image.copy()
+            mask = mask.resize(image.size, Image.Resampling.BILINEAR)
 
         # 将遮罩（红色半透明区域）叠加到原图上
-        # 遮罩中有颜色的区域会显示为红色标记
-        result = Image.alpha_composite(result, mask)
+        # 遮罩中有颜色的区域会显示为红色标记（alpha_composite 返回新图，原图不会被修改）
+        result = Image.alpha_composite(image, mask)
 
         # 转换为 RGB 用于发送给 AI
         return result.convert('RGB')
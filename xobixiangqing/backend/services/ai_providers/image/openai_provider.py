@@ -210,6 +210,20 @@ class OpenAIImageProvider(ImageProvider):
             return "1024x1792"
         return "1024x1024"
 
+    def _extract_images_api_item(self, item: Any) -> Optional[Image.Image]:
+        """Decode one entry of an Images API response (b64_json first, then url)."""
+        if isinstance(item, dict):
+            b64 = item.get("b64_json") or item.get("b64") or item.get("data")
+            url = item.get("url")
+        else:
+            b64 = getattr(item, "b64_json", None)
+            url = getattr(item, "url", None)
+
+        extracted = self._extract_image_from_base64(str(b64)) if b64 else None
+        if not extracted and url:
+            extracted = self._download_image_from_url(str(url))
+        return extracted
+
     def _try_extract_image_from_response(self, message: Any) -> Optional[Image.Image]:
         """
         Try all possible methods to extract an image from the API response
@@ -389,6 +403,55 @@ class OpenAIImageProvider(ImageProvider):
 
         return None
     
+    def generate_images(
+        self,
+        prompt: str,
+        count: int,
+        ref_images: Optional[List[Image.Image]] = None,
+        aspect_ratio: str = "16:9",
+        resolution: str = "2K",
+        *,
+        model: Optional[str] = None,
+    ) -> Optional[List[Image.Image]]:
+        """
+        Generate ``count`` images in one Images API request (``n=count``).
+
+        Only Images API models without reference images are batched (dall-e-3 accepts n=1 only);
+        everything else returns None so the caller falls back to per-image generate_image calls.
+        """
+        selected_model = str(model).strip() if model else self.model
+        if (
+            count <= 1
+            or ref_images
+            or not self._is_images_api_model(selected_model)
+            or selected_model.lower().startswith("dall-e-3")
+        ):
+            return None
+
+        try:
+            img_resp = self.client.images.generate(
+                model=selected_model,
+                prompt=prompt,
+                n=count,
+                size=self._pick_images_api_size(aspect_ratio),
+                response_format="b64_json",
+            )
+        except Exception:
+            logger.warning(
+                "Images API batch generation failed for model=%s; falling back to per-image calls",
+                selected_model,
+                exc_info=True,
+            )
+            return None
+
+        images = []
+        for item in getattr(img_resp, "data", None) or []:
+            extracted = self._extract_images_api_item(item)
+            if extracted:
+                images.append(extracted)
+        logger.info(f"Images API batch returned {len(images)}/{count} images for model={selected_model}")
+        return images or None
+
     def generate_image(
         self,
         prompt: str,
@@ -468,19 +531,7 @@ class OpenAIImageProvider(ImageProvider):
                         response_format="b64_json",
                     )
                     item = img_resp.data[0] if getattr(img_resp, "data", None) else None
-                    b64 = None
-                    url = None
-                    if item is not None:
-                        if isinstance(item, dict):
-                            b64 = item.get("b64_json") or item.get("b64") or item.get("data")
-                            url = item.get("url")
-                        else:
-                            b64 = getattr(item, "b64_json", None)
-                            url = getattr(item, "url", None)
-
-                    extracted = self._extract_image_from_base64(str(b64)) if b64 else None
-                    if not extracted and url:
-                        extracted = self._download_image_from_url(str(url))
+                    extracted = self._extract_images_api_item(item) if item is not None else None
 
                     if extracted:
                         logger.info(f"Successfully generated image via Images API: {extracted.size}, {extracted.mode}")
@@ -15,8 +15,6 @@ import os
 from urllib.parse import urlsplit, urlunsplit
 from typing import Any, Dict, Optional
 
-import httpx
-
 from models import ProjectSettings, Settings
 
 
@@ -113,6 +111,8 @@ def _request_json(
         use_title_rewrite_model=use_title_rewrite_model,
     )
 
+    import httpx  # deferred: only needed when B is actually called
+
     timeout_cfg = httpx.Timeout(timeout, connect=min(5.0, float(timeout)))
     with httpx.Client(timeout=timeout_cfg) as client:
         res = client.request(method, url, headers=headers, json=payload)
@@ -0,0 +1,41 @@
+"""orjson-backed Flask JSON provider (falls back to the stdlib provider when needed)"""
+from typing import Any
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # 可选依赖，未安装时不启用
+    orjson = None
+
+# datetime 交给 Flask 的 default() 处理（HTTP 日期格式），保持与默认 provider 一致的输出
+_ORJSON_OPTIONS = (
+    orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    if orjson is not None else 0
+)
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """
+    Serialize jsonify()/response bodies with orjson.
+
+    Options orjson cannot express (custom separators, indent other than 2,
+    explicit json.dumps kwargs) and values it rejects (e.g. ints > 64 bit)
+    fall back to DefaultJSONProvider.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        indent = kwargs.pop('indent', None)
+        separators = kwargs.pop('separators', None)
+        if kwargs or indent not in (None, 2):
+            return super().dumps(obj, indent=indent, separators=separators, **kwargs)
+        option = _ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+        except TypeError:
+            return super().dumps(obj, indent=indent, separators=separators)
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)